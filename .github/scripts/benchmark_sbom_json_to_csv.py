@@ -0,0 +1,114 @@
+"""
+Times sbom_json_to_csv.py against the version at a baseline revision on a
+synthetic SPDX SBOM, reporting wall time and peak memory, and checks both
+write the same CSV and table.
+
+Usage: benchmark_sbom_json_to_csv.py BASELINE_REV [PACKAGES]
+"""
+import filecmp
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+if len(sys.argv) < 2:
+    sys.exit(__doc__.strip())
+
+baseline_rev = sys.argv[1]
+packages_count = int(sys.argv[2]) if len(sys.argv) > 2 else 100000
+
+script_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "sbom_json_to_csv.py"))
+repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+# Runs a script and reports its peak RSS in kilobytes on stderr
+RUNNER = """
+import resource, runpy, sys
+script = sys.argv[1]
+sys.argv = sys.argv[1:]
+try:
+    runpy.run_path(script, run_name="__main__")
+finally:
+    print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, file=sys.stderr)
+"""
+
+
+def write_sbom(path, count):
+    packages = []
+    relationships = []
+    for i in range(count):
+        kind = ["python", "npm", "go-module", "deb"][i % 4]
+        packages.append({
+            "name": f"package-{i}",
+            "SPDXID": f"SPDXRef-Package-{kind}-package-{i}-{i:016x}",
+            "versionInfo": f"{i % 7}.{i % 13}.{i % 5}",
+            "supplier": "NOASSERTION" if i % 3 else f"Organization: Supplier {i % 100}",
+            "downloadLocation": "NOASSERTION",
+            "licenseConcluded": "NOASSERTION",
+            "licenseDeclared": ["MIT", "Apache-2.0", "BSD-3-Clause", "NOASSERTION"][i % 4],
+            "copyrightText": "NOASSERTION",
+            "externalRefs": [
+                {
+                    "referenceCategory": "SECURITY",
+                    "referenceType": "cpe23Type",
+                    "referenceLocator": f"cpe:2.3:a:package-{i}:package-{i}:{i % 7}:*:*:*:*:*:*:*",
+                },
+                {
+                    "referenceCategory": "PACKAGE-MANAGER",
+                    "referenceType": "purl",
+                    "referenceLocator": f"pkg:{kind}/package-{i}@{i % 7}.{i % 13}.{i % 5}",
+                },
+            ],
+        })
+        relationships.append({
+            "spdxElementId": "SPDXRef-DOCUMENT",
+            "relatedSpdxElement": packages[-1]["SPDXID"],
+            "relationshipType": "CONTAINS",
+        })
+
+    sbom = {
+        "spdxVersion": "SPDX-2.3",
+        "dataLicense": "CC0-1.0",
+        "SPDXID": "SPDXRef-DOCUMENT",
+        "name": "synthetic",
+        "creationInfo": {"created": "2024-01-01T00:00:00Z", "creators": ["Tool: synthetic"]},
+        "packages": packages,
+        "relationships": relationships,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(sbom, f, indent=2)
+
+
+def run(script, sbom, workdir):
+    os.makedirs(workdir)
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", RUNNER, script, sbom, "sbom.csv"],
+        cwd=workdir, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=True,
+    )
+    return time.perf_counter() - start, int(result.stderr.split()[-1])
+
+
+with tempfile.TemporaryDirectory() as tmp:
+    sbom_path = os.path.join(tmp, "sbom.json")
+    write_sbom(sbom_path, packages_count)
+
+    baseline_script = os.path.join(tmp, "baseline.py")
+    with open(baseline_script, "w", encoding="utf-8") as f:
+        f.write(subprocess.run(
+            ["git", "-C", repo_root, "show", f"{baseline_rev}:.github/scripts/sbom_json_to_csv.py"],
+            capture_output=True, text=True, check=True,
+        ).stdout)
+
+    print(f"{packages_count} packages, {os.path.getsize(sbom_path) / 1e6:.0f}MB SBOM")
+    for label, script in ((baseline_rev, baseline_script), ("working tree", script_path)):
+        elapsed, peak = run(script, sbom_path, os.path.join(tmp, label.replace("~", "-").replace(" ", "-")))
+        print(f"  {label:<13} {elapsed:6.2f}s  peak RSS {peak / 1024:7.1f}MB")
+
+    for name in ("sbom.csv", "sbom_table.txt"):
+        assert filecmp.cmp(
+            os.path.join(tmp, baseline_rev.replace("~", "-"), name),
+            os.path.join(tmp, "working-tree", name),
+            shallow=False,
+        ), f"{name} differs from {baseline_rev}"
@@ -4,14 +4,6 @@ import sys
 # from pathlib import Path
 from tabulate import tabulate
 
-input_file = sys.argv[1] if len(sys.argv) > 1 else "sbom.json"
-output_file = sys.argv[2] if len(sys.argv) > 2 else "sbom.csv"
-
-with open(input_file, "r", encoding="utf-8") as f:
-    sbom = json.load(f)
-
-packages = sbom.get("packages", [])
-
 columns = [
     "name",
     "versionInfo",
@@ -23,6 +15,111 @@ columns = [
     "externalRefs"
 ]
 
+WHITESPACE = json.decoder.WHITESPACE
+# Characters that can follow a prefix of a number, or nothing if the buffer ends there
+NUMBER_CONTINUATIONS = ("", *".eE+-0123456789")
+
+
+class JsonStream:
+    # Reads JSON from a file a chunk at a time, so large arrays can be walked one element at a time
+
+    def __init__(self, f, chunk_size=1 << 16):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.decoder = json.JSONDecoder()
+
+    def fill(self):
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        while True:
+            self.pos = WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"Expected {char!r} at offset {self.pos} of the current chunk")
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+            # A number at the end of the buffer may carry on in the next chunk, and one cut
+            # after its "." or "e" decodes as the digits before it
+            if (
+                isinstance(value, (int, float))
+                and not isinstance(value, bool)
+                and self.buffer[end:end + 1] in NUMBER_CONTINUATIONS
+                and self.fill()
+            ):
+                continue
+            self.pos = end
+            return value
+
+    def iter_array(self, read):
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield read()
+            if self.peek() != ",":
+                break
+            self.pos += 1
+        self.expect("]")
+
+    def iter_object(self):
+        # Yields each key; the caller must read or skip its value before asking for the next
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            if self.peek() != ",":
+                break
+            self.pos += 1
+        self.expect("}")
+
+    def skip(self):
+        # Walks past a value an element at a time rather than decoding it whole
+        first = self.peek()
+        if first == "[":
+            for _ in self.iter_array(self.skip):
+                pass
+        elif first == "{":
+            for _ in self.iter_object():
+                self.skip()
+        else:
+            self.value()
+
+
+def iter_packages(f, chunk_size=1 << 16):
+    stream = JsonStream(f, chunk_size)
+    for key in stream.iter_object():
+        if key == "packages":
+            yield from stream.iter_array(stream.value)
+        else:
+            stream.skip()
+
 
 def get_type(pkg):
     spdxid = pkg.get("SPDXID", "")
@@ -42,37 +139,32 @@ def get_external_refs(pkg):
     return ";".join([ref.get("referenceLocator", "") for ref in refs])
 
 
-with open(output_file, "w", newline="", encoding="utf-8") as csvfile:
-    writer = csv.DictWriter(csvfile, fieldnames=columns)
-    writer.writeheader()
-    for pkg in packages:
-        row = {
-            "name": pkg.get("name", ""),
-            "versionInfo": pkg.get("versionInfo", ""),
-            "type": get_type(pkg),
-            "supplier": pkg.get("supplier", ""),
-            "downloadLocation": pkg.get("downloadLocation", ""),
-            "licenseConcluded": pkg.get("licenseConcluded", ""),
-            "licenseDeclared": pkg.get("licenseDeclared", ""),
-            "externalRefs": get_external_refs(pkg)
-        }
-        writer.writerow(row)
+if __name__ == "__main__":
+    input_file = sys.argv[1] if len(sys.argv) > 1 else "sbom.json"
+    output_file = sys.argv[2] if len(sys.argv) > 2 else "sbom.csv"
 
-print(f"CSV export complete: {output_file}")
+    # One pass over the packages writes the CSV. The grid table needs every row before it
+    # can be drawn, so only the rows (not the parsed SBOM) are kept for it.
+    table = []
+    with open(input_file, "r", encoding="utf-8") as f, \
+            open(output_file, "w", newline="", encoding="utf-8") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(columns)
+        for pkg in iter_packages(f):
+            row = [
+                pkg.get("name", ""),
+                pkg.get("versionInfo", ""),
+                get_type(pkg),
+                pkg.get("supplier", ""),
+                pkg.get("downloadLocation", ""),
+                pkg.get("licenseConcluded", ""),
+                pkg.get("licenseDeclared", ""),
+                get_external_refs(pkg)
+            ]
+            writer.writerow(row)
+            table.append(row)
 
+    print(f"CSV export complete: {output_file}")
 
-with open("sbom_table.txt", "w", encoding="utf-8") as f:
-    table = []
-    for pkg in packages:
-        row = [
-            pkg.get("name", ""),
-            pkg.get("versionInfo", ""),
-            get_type(pkg),
-            pkg.get("supplier", ""),
-            pkg.get("downloadLocation", ""),
-            pkg.get("licenseConcluded", ""),
-            pkg.get("licenseDeclared", ""),
-            get_external_refs(pkg)
-        ]
-        table.append(row)
-    f.write(tabulate(table, columns, tablefmt="grid"))
+    with open("sbom_table.txt", "w", encoding="utf-8") as f:
+        f.write(tabulate(table, columns, tablefmt="grid"))
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+"""
+benchmark_calculate_version.py
+
+Times calculate_version over synthetic histories of CommitRecords, to check
+the engine scales linearly before pointing it at a large repository. Each
+history mixes plain, empty and merge commits with the occasional version
+command, and is generated on the fly so memory stays flat.
+
+Usage:
+  benchmark_calculate_version.py [--sizes=<sizes>] [--seed=<n>]
+
+Options:
+  --sizes=<sizes>  Comma separated history lengths [default: 10000,100000,1000000]
+  --seed=<n>       Random seed for the synthetic histories [default: 0]
+"""
+import random
+import time
+
+from collections import deque
+from docopt import docopt
+from calculate_version import CommitRecord, calculate_version
+
+COMMANDS = ["+minor", "+major", "+setstatus beta", "+clearstatus"]
+
+
+def synthetic_history(size, seed, command_rate=0.001, merge_rate=0.05, empty_rate=0.1):
+    """Yields `size` CommitRecords, newest first"""
+    rnd = random.Random(seed)
+    tree = 0
+
+    for i in range(size):
+        if rnd.random() < merge_rate:
+            yield CommitRecord(f"Merge branch {i}", 2, f"{tree:040x}", f"{i:040x}")
+            continue
+
+        message = rnd.choice(COMMANDS) if rnd.random() < command_rate else f"Change {i}"
+        yield CommitRecord(message, 1, f"{tree:040x}", f"{i:040x}")
+
+        if rnd.random() >= empty_rate:
+            tree += 1
+
+
+def main(sizes, seed):
+    """Main entrypoint"""
+    print(f"{'commits':>10} {'generate':>10} {'calculate':>10} {'commits/s':>12}  version")
+
+    for size in sizes:
+        start = time.perf_counter()
+        deque(synthetic_history(size, seed), maxlen=0)
+        generate = time.perf_counter() - start
+
+        start = time.perf_counter()
+        version = calculate_version(commits=synthetic_history(size, seed))
+        total = time.perf_counter() - start
+
+        calculate = max(total - generate, 0)
+        rate = size / calculate if calculate else float("inf")
+        print(f"{size:>10} {generate:>9.2f}s {calculate:>9.2f}s {rate:>12,.0f}  {version}")
+
+
+if __name__ == "__main__":
+    args = docopt(__doc__)
+    main([int(size) for size in args["--sizes"].split(",")], int(args["--seed"]))
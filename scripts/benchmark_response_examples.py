@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+"""
+benchmark_response_examples.py
+
+Times generate_examples.iter_response_examples against the jsonpath_rw
+expression it replaced, on a synthetic spec with many operations. The spec
+includes PATCH operations, parameters and other non-response keys. Both
+must find the same examples under the same paths.
+
+Usage:
+  benchmark_response_examples.py [--paths=<n>] [--rounds=<n>]
+
+Options:
+  --paths=<n>   Paths in the synthetic spec [default: 2000]
+  --rounds=<n>  Times to run each implementation [default: 3]
+"""
+import time
+
+from statistics import median
+from docopt import docopt
+from jsonpath_rw import parse
+from generate_examples import iter_response_examples
+
+EXPRESSION = "paths.*.*.(response|(responses.*)).content.*.(example|(examples.*.value))"
+
+
+def synthetic_spec(paths):
+    """Returns a spec with `paths` paths, each with several operations, responses and examples"""
+    spec_paths = {}
+    for i in range(paths):
+        operations = {"parameters": [{"name": "id", "in": "path"}], "summary": f"Path {i}"}
+        for verb in ("get", "post", "put", "patch"):
+            operations[verb] = {
+                "summary": f"{verb} {i}",
+                "responses": {
+                    code: {
+                        "description": "A response",
+                        "content": {
+                            "application/fhir+json": {
+                                "schema": {"type": "object"},
+                                "example": {"resourceType": "Bundle", "id": i, "entry": [{"code": code}] * 10},
+                                "examples": {
+                                    f"example-{n}": {"summary": "An example", "value": {"id": i, "n": n}}
+                                    for n in range(3)
+                                },
+                            },
+                        },
+                    }
+                    for code in ("200", "400", "404")
+                },
+            }
+        spec_paths[f"/resource-{i}/{{id}}" if i % 10 else f"/dispatch-{i}"] = operations
+
+    return {"paths": spec_paths}
+
+
+def with_jsonpath(spec):
+    """The previous extraction, returning (full path, example) for every match that isn't a PATCH"""
+    return [
+        (str(match.full_path), match.value)
+        for match in parse(EXPRESSION).find(spec)
+        if "patch" not in str(match.full_path)
+    ]
+
+
+def with_walker(spec):
+    """The same as with_jsonpath, using iter_response_examples"""
+    return [(".".join(("paths",) + path), example) for path, example in iter_response_examples(spec)]
+
+
+def time_implementation(implementation, spec, rounds):
+    """Returns the median time and the result of an implementation"""
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = implementation(spec)
+        timings.append(time.perf_counter() - start)
+
+    return median(timings), result
+
+
+def main(paths, rounds):
+    """Main entrypoint"""
+    spec = synthetic_spec(paths)
+
+    jsonpath_time, expected = time_implementation(with_jsonpath, spec, rounds)
+    walker_time, result = time_implementation(with_walker, spec, rounds)
+    assert result == expected, "iter_response_examples disagrees with jsonpath_rw"
+
+    print(f"{paths} paths, {len(result)} examples, median of {rounds} rounds")
+    print(f"  jsonpath_rw: {jsonpath_time * 1000:8.1f}ms")
+    print(f"  walker:      {walker_time * 1000:8.1f}ms")
+
+
+if __name__ == "__main__":
+    args = docopt(__doc__)
+    main(int(args["--paths"]), int(args["--rounds"]))
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+"""
+benchmark_startup.py
+
+Times a cold import of set_version (and so calculate_version) in a fresh
+interpreter, for this checkout and for the scripts at a baseline revision
+checked out into a temporary git worktree.
+
+Usage:
+  benchmark_startup.py --baseline=<rev> [--rounds=<n>]
+
+Options:
+  --baseline=<rev>  Revision to compare against
+  --rounds=<n>      Interpreters to start for each checkout [default: 10]
+"""
+import os.path
+import subprocess
+import sys
+import tempfile
+import time
+
+from statistics import median
+from docopt import docopt
+
+SCRIPT_LOCATION = os.path.join(os.path.dirname(os.path.abspath(__file__)))
+REPO_ROOT = os.path.abspath(os.path.join(SCRIPT_LOCATION, ".."))
+
+
+def time_import(scripts_dir, rounds):
+    """Returns the median wall time of importing set_version in a new interpreter"""
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-c", "import set_version"], cwd=scripts_dir, check=True
+        )
+        timings.append(time.perf_counter() - start)
+
+    return median(timings)
+
+
+def time_baseline(rev, rounds):
+    """Checks out `rev` into a temporary worktree and times its scripts"""
+    worktree = tempfile.mkdtemp(prefix="startup-baseline-")
+    subprocess.run(
+        ["git", "-C", REPO_ROOT, "worktree", "add", "--detach", "--quiet", worktree, rev],
+        check=True,
+    )
+    try:
+        return time_import(os.path.join(worktree, "scripts"), rounds)
+    finally:
+        subprocess.run(
+            ["git", "-C", REPO_ROOT, "worktree", "remove", "--force", worktree], check=True
+        )
+
+
+def main(baseline, rounds):
+    """Main entrypoint"""
+    before = time_baseline(baseline, rounds)
+    after = time_import(SCRIPT_LOCATION, rounds)
+
+    print(f"import set_version, median of {rounds} cold starts")
+    print(f"  {baseline}: {before * 1000:.1f}ms")
+    print(f"  working tree: {after * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    args = docopt(__doc__)
+    main(args["--baseline"], int(args["--rounds"]))
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+"""
+benchmark_without_empty.py
+
+Times finding the non-empty commits in the versionable history of this
+repository with the previous without_empty, which compared the tree of each
+GitPython commit object in turn, against comparing the tree shas of
+CommitRecords from commits_from_repo and from commits_from_git_log, which
+reads every tree sha in the same git log call as the messages. Each round
+walks the history from scratch, and all of them must agree.
+
+Usage:
+  benchmark_without_empty.py [--rounds=<n>]
+
+Options:
+  --rounds=<n>  Times to run each implementation [default: 5]
+"""
+import itertools
+import time
+
+from statistics import median
+from docopt import docopt
+from calculate_version import (
+    REPO_ROOT,
+    commits_from_git_log,
+    commits_from_repo,
+    get_repo,
+    get_versionable_commits,
+)
+
+
+def without_empty_by_object(commits):
+    """The previous without_empty, which reads each commit's tree from its object"""
+    pairs = zip(commits, commits[1:])
+
+    for fst, snd in pairs:
+        if fst.tree != snd.tree:
+            yield fst
+
+    if commits:
+        yield commits[-1]
+
+
+def without_empty_by_sha(records):
+    """Finds the same commits from a stream of CommitRecords, comparing tree shas"""
+    records = [r for r in records if r.parent_count == 1]
+    records = list(itertools.takewhile(lambda r: "+startversioning" not in r.message, records))
+
+    for fst, snd in zip(records, records[1:]):
+        if fst.tree != snd.tree:
+            yield fst.sha
+
+    if records:
+        yield records[-1].sha
+
+
+def time_implementation(implementation, rounds):
+    """Returns the median time and the result of running an implementation"""
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = list(implementation())
+        timings.append(time.perf_counter() - start)
+
+    return median(timings), result
+
+
+def main(rounds):
+    """Main entrypoint"""
+    repo = get_repo()
+
+    by_object, expected = time_implementation(
+        lambda: (c.hexsha for c in without_empty_by_object(get_versionable_commits(repo))), rounds
+    )
+    print(f"{len(expected)} non-empty commits, median of {rounds} rounds")
+    print(f"  GitPython commit objects: {by_object * 1000:.1f}ms")
+
+    for label, records in (
+        ("commits_from_repo", lambda: commits_from_repo(repo)),
+        ("commits_from_git_log", lambda: commits_from_git_log(REPO_ROOT)),
+    ):
+        elapsed, result = time_implementation(lambda: without_empty_by_sha(records()), rounds)
+        assert result == expected, f"{label} disagrees with the previous implementation"
+        print(f"  {label + ':':<25} {elapsed * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    args = docopt(__doc__)
+    main(int(args["--rounds"]))
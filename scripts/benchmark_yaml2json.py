@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+"""
+benchmark_yaml2json.py
+
+Converts a synthetic OpenAPI document of a few megabytes with yaml2json.py,
+with and without --stream, and reports the time and peak memory of each.
+Both runs must produce the same json.
+
+Usage:
+  benchmark_yaml2json.py [--paths=<n>]
+
+Options:
+  --paths=<n>  Paths in the synthetic document [default: 5000]
+"""
+import filecmp
+import os.path
+import subprocess
+import sys
+import tempfile
+import time
+
+from docopt import docopt
+
+SCRIPT_LOCATION = os.path.join(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs yaml2json's main in a child interpreter and reports its peak RSS in kilobytes on stderr
+RUNNER = """
+import resource, sys
+sys.argv = ["yaml2json.py"] + sys.argv[1:]
+sys.path.insert(0, {scripts!r})
+import yaml2json
+try:
+    yaml2json.main(stream="--stream" in sys.argv)
+finally:
+    print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, file=sys.stderr)
+"""
+
+PATH_TEMPLATE = """  /resource-{i}/{{id}}:
+    get:
+      summary: Read resource {i}
+      description: Returns a single resource, last reviewed on 2021-0{month}-1{day}.
+      x-reviewed: 2021-0{month}-1{day}
+      parameters:
+        - name: id
+          in: path
+          required: true
+          schema:
+            type: string
+            pattern: '^[0-9]{{10}}$'
+      responses:
+        '200':
+          description: The resource
+          content:
+            application/fhir+json:
+              schema:
+                type: object
+                properties:
+                  resourceType:
+                    type: string
+                    enum: [Resource{i}]
+                  id:
+                    type: string
+                  meta:
+                    type: object
+                    properties:
+                      versionId: {{type: string}}
+                      lastUpdated: {{type: string, format: date-time}}
+              example:
+                resourceType: Resource{i}
+                id: '{i:010d}'
+                meta: {{versionId: '1', lastUpdated: 2021-0{month}-1{day}T09:30:00}}
+"""
+
+
+def write_document(path, paths):
+    """Writes a synthetic OpenAPI document with `paths` paths"""
+    with open(path, "w") as document:
+        document.write("openapi: 3.0.0\ninfo:\n  title: Synthetic\n  version: 1.0.0\npaths:\n")
+        for i in range(paths):
+            document.write(PATH_TEMPLATE.format(i=i, month=i % 9 + 1, day=i % 10))
+
+
+def run(document, output, stream):
+    """Returns the wall time and peak RSS of converting the document"""
+    args = [sys.executable, "-c", RUNNER.format(scripts=SCRIPT_LOCATION)]
+    if stream:
+        args.append("--stream")
+
+    with open(document) as stdin, open(output, "w") as stdout:
+        start = time.perf_counter()
+        result = subprocess.run(args, stdin=stdin, stdout=stdout, stderr=subprocess.PIPE, check=True)
+        elapsed = time.perf_counter() - start
+
+    return elapsed, int(result.stderr.split()[-1])
+
+
+def main(paths):
+    """Main entrypoint"""
+    with tempfile.TemporaryDirectory() as workdir:
+        document = os.path.join(workdir, "spec.yaml")
+        write_document(document, paths)
+        size = os.path.getsize(document) / 1e6
+
+        outputs = {}
+        print(f"{size:.1f}MB document with {paths} paths")
+        for stream in (False, True):
+            outputs[stream] = os.path.join(workdir, f"spec-{stream}.json")
+            elapsed, peak = run(document, outputs[stream], stream)
+            label = "--stream" if stream else "default"
+            print(f"  {label:<9} {elapsed:6.2f}s  peak RSS {peak / 1024:6.1f}MB")
+
+        assert filecmp.cmp(outputs[False], outputs[True], shallow=False), "outputs differ"
+
+
+if __name__ == "__main__":
+    args = docopt(__doc__)
+    main(int(args["--paths"]))
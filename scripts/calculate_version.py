@@ -14,17 +14,48 @@ Commands:
     +setstatus <status>    Set the prerelease status to <status>
     +clearstatus           Clear the prerelease status
     +startversioning       Reset version to v1.0.0-alpha
+
+Set CALCULATE_VERSION_CACHE to a file path to cache a summary of the
+history under HEAD, so later runs only walk the commits added since.
 """
 
+import os
 import os.path
 import itertools
-import git
-import semver
+import json
+import subprocess
+import sys
+
+from collections import namedtuple
+from functools import lru_cache
 
 
 SCRIPT_LOCATION = os.path.join(os.path.dirname(os.path.abspath(__file__)))
 REPO_ROOT = os.path.abspath(os.path.join(SCRIPT_LOCATION, ".."))
-REPO = git.Repo(REPO_ROOT)
+
+# The parts of a commit the version depends on. sha is only needed to use a cache, and
+# files (the paths the commit changed) only for targets filtered by path. A tree of None
+# means the commit changed nothing.
+CommitRecord = namedtuple(
+    "CommitRecord", ["message", "parent_count", "tree", "sha", "files"], defaults=[None, None]
+)
+
+# Something versioned from this repository. A target with paths only counts commits
+# that change a file under one of them, or that change nothing at all, so commands in
+# empty commits apply to every target.
+Target = namedtuple(
+    "Target",
+    ["name", "paths", "base_major", "base_minor", "base_revision", "base_pre"],
+    defaults=[(), 1, 0, 0, "alpha"],
+)
+
+
+@lru_cache(maxsize=None)
+def get_repo():
+    """Opens the repository on first use, so importing this module doesn't load GitPython"""
+    import git
+
+    return git.Repo(REPO_ROOT)
 
 
 def get_versionable_commits(repo):
@@ -53,34 +84,190 @@ def is_minor_inc(commit):
     return "+minor" in commit.message
 
 
-def without_empty(commits):
-    """Takes a list of commits and returns a list without empty commits"""
-    pairs = zip(commits, commits[1:])
-
-    for fst, snd in pairs:
-        if fst.tree != snd.tree:
-            # This means 'fst' isn't empty
-            yield fst
-
-    # Have to remember to yield the last one
-    if commits:
-        yield commits[-1]
+def summarise_commit(commit):
+    """
+    Returns the history summary of a single non-merge CommitRecord.
+
+    A summary describes a run of commits, newest first, by what
+    calculate_version needs from them: the newest status command, the
+    number of +major commits, the +minor commits before the first +major,
+    and the commits before the first +major or +minor (the patch zone),
+    less those that left the tree of their parent unchanged. Summaries of
+    adjacent runs are joined with combine_summaries.
+    """
+    message = commit.message
+
+    if "+startversioning" in message:
+        return empty_summary(stopped=True)
+
+    summary = empty_summary()
+    if is_status_set_command(commit):
+        summary["status"] = message
+
+    if is_major_inc(commit):
+        summary["majors"] = 1
+        summary["minor_open"] = False
+        summary["patch_open"] = False
+    elif is_minor_inc(commit):
+        summary["minors"] = 1
+        summary["patch_open"] = False
+    else:
+        summary.update(zone_size=1, zone_first_tree=commit.tree, zone_last_tree=commit.tree)
+
+    return summary
+
+
+def empty_summary(stopped=False):
+    """Returns the summary of no commits, or of a +startversioning commit if stopped"""
+    return {
+        "stopped": stopped,
+        "status": None,
+        "majors": 0,
+        "minors": 0,
+        "minor_open": not stopped,
+        "patch_open": not stopped,
+        "zone_size": 0,
+        "zone_changes": 0,
+        "zone_first_tree": None,
+        "zone_last_tree": None,
+    }
+
+
+def combine_summaries(newer, older):
+    """Joins the summaries of two adjacent runs of commits"""
+    if newer["stopped"]:
+        return newer
+
+    combined = dict(newer)
+    combined["stopped"] = older["stopped"]
+    combined["majors"] += older["majors"]
+    if combined["status"] is None:
+        combined["status"] = older["status"]
+
+    if newer["minor_open"]:
+        combined["minors"] += older["minors"]
+        combined["minor_open"] = older["minor_open"]
+
+    if newer["patch_open"]:
+        combined["patch_open"] = older["patch_open"]
+
+        if older["zone_size"]:
+            combined["zone_changes"] += older["zone_changes"]
+            if newer["zone_size"] and newer["zone_last_tree"] is not None:
+                combined["zone_changes"] += newer["zone_last_tree"] != older["zone_first_tree"]
+            else:
+                combined["zone_first_tree"] = older["zone_first_tree"]
+
+            combined["zone_size"] += older["zone_size"]
+            combined["zone_last_tree"] = older["zone_last_tree"]
+
+    return combined
+
+
+def commits_from_repo(repo, rev="HEAD"):
+    """Yields a CommitRecord for every commit under `rev` of a GitPython repository, newest first"""
+    for commit in repo.iter_commits(rev):
+        yield CommitRecord(commit.message, len(commit.parents), commit.tree.hexsha, commit.hexsha)
+
+
+def commits_from_git_log(path=REPO_ROOT, rev="HEAD", with_files=False, chunk_size=1 << 16):
+    """
+    Yields a CommitRecord for every commit under `rev`, newest first.
+
+    Commits are streamed from a single git log process, which is stopped
+    if the caller closes the generator early. Raises RuntimeError with
+    git's message if git log fails. With `with_files`, the same process
+    also lists the files each commit changed.
+    """
+    args = ["git", "-C", path, "log", "-z", "--format=%x1e%H %T %P%n%B", rev]
+    if with_files:
+        # Without --no-renames, a moved file is only listed under its new path
+        args[-1:-1] = ["--name-only", "--no-renames"]
+
+    process = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    try:
+        buffer = b""
+        entry = None
+        for chunk in iter(lambda: process.stdout.read(chunk_size), b""):
+            *tokens, buffer = (buffer + chunk).split(b"\0")
+            for token in tokens:
+                # Each commit starts with a record separator, followed by its files
+                if token.startswith(b"\x1e"):
+                    if entry is not None:
+                        yield parse_log_entry(entry, with_files)
+                    entry = [token[1:]]
+                else:
+                    entry.append(token)
+
+        # git only exits once it has written everything, so check it before the last commit
+        error = process.stderr.read().decode("utf-8", errors="replace").strip()
+        if process.wait() != 0:
+            raise RuntimeError(f"git log failed in {path}: {error}")
+
+        if buffer:
+            entry.append(buffer)
+        if entry is not None:
+            yield parse_log_entry(entry, with_files)
+    finally:
+        process.stdout.close()
+        process.stderr.close()
+        if process.poll() is None:
+            process.terminate()
+        process.wait()
+
+
+def parse_log_entry(entry, with_files=False):
+    """Parses the tokens of one commit printed by commits_from_git_log"""
+    header, _, message = entry[0].decode("utf-8", errors="replace").partition("\n")
+    sha, tree, *parents = header.split(" ")
+
+    files = None
+    if with_files:
+        files = [name.decode("utf-8", errors="replace").lstrip("\n") for name in entry[1:]]
+
+    return CommitRecord(message, len([p for p in parents if p]), tree, sha, files)
+
+
+def summarise_history(commits, cache=None):
+    """
+    Summarises the versionable history in a stream of CommitRecords in a single pass.
+
+    If `cache` maps a commit sha to the summary of the history under it,
+    the walk stops at the first cached commit, provided every commit above
+    it has a single parent. Only then does the walk visit the commits in
+    the order it would have when that commit was the newest.
+    """
+    summary = empty_summary()
+    linear = True
+
+    for commit in commits:
+        if linear and cache and commit.sha in cache:
+            return combine_summaries(summary, cache[commit.sha])
+
+        # Ignore merge commits
+        if commit.parent_count != 1:
+            linear = False
+            continue
+
+        summary = combine_summaries(summary, summarise_commit(commit))
+        if summary["stopped"]:
+            break
+
+    return summary
+
+
+def version_from_summary(summary, base_major=1, base_minor=0, base_revision=0, base_pre="alpha"):
+    """Calculates a semver from the summary of a history"""
+    import semver
 
-
-def calculate_version(base_major=1, base_minor=0, base_revision=0, base_pre="alpha"):
-    """Calculates a semver based on commit history and special flags in commit messages"""
     major = base_major
     minor = base_minor
     patch = base_revision
     pre = base_pre
 
-    commits = get_versionable_commits(REPO)
-
     # Figure out what the current 'status' (prerelease) is
-    status_sets = [c for c in commits if is_status_set_command(c)]
-
-    if status_sets:
-        most_recent_message = status_sets[0].message.strip()
+    if summary["status"] is not None:
+        most_recent_message = summary["status"].strip()
 
         if most_recent_message.startswith("+setstatus "):
             pre = most_recent_message.split(" ")[
@@ -91,29 +278,155 @@ def calculate_version(base_major=1, base_minor=0, base_revision=0, base_pre="alp
             pre = None
 
     # If there are any +major in commit messages, increment the counter
-    major_incs = [c for c in commits if is_major_inc(c)]
-
-    if major_incs:
-        major += len(major_incs)
+    if summary["majors"]:
+        major += summary["majors"]
         minor = 0
         patch = 0
 
-    # If there are any +minor in commit messages, increment the counter
-    # We only care about commits after the last major increment
-    commits = list(itertools.takewhile(lambda c: not is_major_inc(c), commits))
-    minor_incs = [c for c in commits if is_minor_inc(c)]
-
-    if minor_incs:
-        minor += len(minor_incs)
+    # If there are any +minor after the last major increment, increment the counter
+    if summary["minors"]:
+        minor += summary["minors"]
         patch = 0
 
-    # Now increment patch number for every commit since the last patch
-    commits = list(itertools.takewhile(lambda c: not is_minor_inc(c), commits))
-    commits = list(without_empty(commits))
-    patch = len(commits)
+    # Now increment patch number for every non-empty commit since the last patch
+    patch = summary["zone_changes"] + (1 if summary["zone_size"] else 0)
 
     return "v" + str(semver.VersionInfo(major, minor, patch, pre))
 
 
+def commit_for_target(target, commit):
+    """Returns the commit as a target sees it, or None if it doesn't count towards the target"""
+    if not target.paths:
+        return commit
+
+    if commit.files is None:
+        raise ValueError(f"Target {target.name} needs the files changed by commit {commit.sha}")
+
+    if "+startversioning" in commit.message or not commit.files:
+        return commit._replace(tree=None)
+
+    for name in commit.files:
+        for path in target.paths:
+            path = path.rstrip("/")
+            if name == path or name.startswith(path + "/"):
+                return commit
+
+    return None
+
+
+def summarise_targets(commits, targets):
+    """Summarises the history of several targets in a single pass over a stream of CommitRecords"""
+    summaries = {target.name: empty_summary() for target in targets}
+
+    for commit in commits:
+        # Ignore merge commits
+        if commit.parent_count != 1:
+            continue
+
+        open_targets = 0
+        for target in targets:
+            summary = summaries[target.name]
+            if summary["stopped"]:
+                continue
+
+            seen = commit_for_target(target, commit)
+            if seen is not None:
+                summary = combine_summaries(summary, summarise_commit(seen))
+                summaries[target.name] = summary
+
+            open_targets += not summary["stopped"]
+
+        if not open_targets:
+            break
+
+    return summaries
+
+
+def calculate_versions(targets, commits=None):
+    """
+    Calculates the version of several Targets, returning a dict of target name to version.
+
+    The history is walked once for all of them. `commits` defaults to the
+    history of this repository, with changed files listed if any target
+    filters by path.
+    """
+    if len({target.name for target in targets}) != len(targets):
+        raise ValueError("Target names must be unique")
+
+    if commits is None:
+        commits = commits_from_git_log(with_files=any(target.paths for target in targets))
+
+    stream = iter(commits)
+    try:
+        summaries = summarise_targets(stream, targets)
+    finally:
+        if hasattr(stream, "close"):
+            stream.close()
+
+    return {
+        target.name: version_from_summary(
+            summaries[target.name],
+            target.base_major,
+            target.base_minor,
+            target.base_revision,
+            target.base_pre,
+        )
+        for target in targets
+    }
+
+
+def load_cache(cache_path):
+    """Returns the cached summaries, or an empty cache if the file is missing or unreadable"""
+    try:
+        with open(cache_path) as cache_file:
+            cache = json.load(cache_file)
+    except (OSError, ValueError):
+        return {}
+
+    return cache if isinstance(cache, dict) else {}
+
+
+def save_cache(cache_path, cache, max_entries=50):
+    """Writes the most recently added summaries to the cache file"""
+    entries = list(cache.items())[-max_entries:]
+    with open(cache_path, "w") as cache_file:
+        json.dump(dict(entries), cache_file)
+
+
+def calculate_version(
+    base_major=1, base_minor=0, base_revision=0, base_pre="alpha", cache_path=None, commits=None
+):
+    """
+    Calculates a semver based on commit history and special flags in commit messages.
+
+    `commits` is an iterable of CommitRecords, newest first, and defaults
+    to the history of this repository read with git log.
+    """
+    cache_path = cache_path or os.environ.get("CALCULATE_VERSION_CACHE")
+    cache = load_cache(cache_path) if cache_path else {}
+
+    if commits is None:
+        commits = commits_from_git_log()
+
+    stream = iter(commits)
+    try:
+        head = next(stream, None)
+        summary = summarise_history(itertools.chain([head] if head else [], stream), cache)
+    finally:
+        # Stops the git log process if the walk ended early
+        if hasattr(stream, "close"):
+            stream.close()
+
+    if cache_path and head and head.sha:
+        cache.pop(head.sha, None)
+        cache[head.sha] = summary
+        save_cache(cache_path, cache)
+
+    return version_from_summary(summary, base_major, base_minor, base_revision, base_pre)
+
+
 if __name__ == "__main__":
-    print(calculate_version())
+    if "--help" in sys.argv[1:] or "-h" in sys.argv[1:]:
+        print(__doc__)
+    else:
+        print(calculate_version())
@@ -3,80 +3,374 @@
 """
 generate_example.py
 
+Only files whose content changed are rewritten. The files written are
+listed in OUT_DIR/.examples-manifest.json, and those the last run wrote
+that are no longer produced are removed.
+
 Usage:
-  generate_example.py SPEC_FILE OUT_DIR
+  generate_example.py SPEC_FILE OUT_DIR [--workers=<n>]
+
+Options:
+  --workers=<n>  Processes to generate resource examples in [default: 1]
 """
 import json
 import os
 import os.path
+from concurrent.futures import ProcessPoolExecutor
 from docopt import docopt
-from jsonpath_rw import parse
 
 
-def generate_resource_example(schema_dict, path=None):
+class SchemaResolver:
+    """
+    Resolves $ref, allOf and oneOf in the schemas of an OAS spec.
+
+    Each reference and each allOf is resolved once and the result reused,
+    so every use of a component shares the same resolved schema (and its
+    memoised example). References that loop back on themselves raise a
+    RuntimeError naming the loop.
+    """
+
+    def __init__(self, spec):
+        self.spec = spec
+        self._resolved = {}
+        self._resolving = []
+        self._generating = set()
+
+    def resolve(self, schema, one_of=True):
+        """
+        Returns the schema with any $ref, allOf or oneOf at its top level resolved.
+
+        A oneOf resolves to its first alternative, unless `one_of` is False
+        (array items give an example of every alternative).
+        """
+        if "$ref" in schema:
+            return self._resolve_ref(schema["$ref"], one_of)
+        if "allOf" in schema:
+            return self._resolve_all_of(schema)
+        if one_of and "oneOf" in schema and schema_type(schema) is None:
+            return self.resolve(schema["oneOf"][0])
+
+        return schema
+
+    def _resolve_ref(self, ref, one_of=True):
+        if (ref, one_of) in self._resolved:
+            return self._resolved[(ref, one_of)]
+
+        if ref in self._resolving:
+            loop = " -> ".join(self._resolving[self._resolving.index(ref):] + [ref])
+            raise RuntimeError(f"Circular $ref: {loop}")
+
+        if not ref.startswith("#/"):
+            raise RuntimeError(f"Cannot resolve $ref {ref}, only local references are supported")
+
+        target = self.spec
+        for part in ref[2:].split("/"):
+            part = part.replace("~1", "/").replace("~0", "~")
+            if not isinstance(target, dict) or part not in target:
+                raise RuntimeError(f"Cannot resolve $ref {ref}")
+            target = target[part]
+
+        self._resolving.append(ref)
+        try:
+            resolved = self.resolve(target, one_of)
+        finally:
+            self._resolving.pop()
+
+        self._resolved[(ref, one_of)] = resolved
+
+        return resolved
+
+    def _resolve_all_of(self, schema):
+        if id(schema) in self._resolved:
+            return self._resolved[id(schema)][1]
+
+        # Later parts override earlier ones, and the schema's own keys override them all
+        merged = {}
+        parts = [self.resolve(part) for part in schema["allOf"]]
+        parts.append({k: v for k, v in schema.items() if k != "allOf"})
+        for part in parts:
+            for key, value in part.items():
+                if key == "properties":
+                    merged["properties"] = {**merged.get("properties", {}), **value}
+                else:
+                    merged[key] = value
+
+        # Hold the schema too, so its id isn't reused while it is cached
+        self._resolved[id(schema)] = (schema, merged)
+
+        return merged
+
+
+def schema_type(schema):
+    """Returns the type of a schema, inferring object or array from its keywords if it has none"""
+    if "type" in schema:
+        return schema["type"]
+    if "properties" in schema:
+        return "object"
+    if "items" in schema:
+        return "array"
+
+    return None
+
+
+def generate_resource_example(schema_dict, path=None, cache=None, resolver=None):
     """
     Generates resource examples from an OAS schema
 
     Incomplete, especially around multiple arity/polymorphic parts such as anyOf.
     In future this should be replaced by an example generator that uses FHIR tooling.
+
+    If a `cache` dict is given, examples are memoised by the identity of
+    the properties they were generated from, so a sub-schema shared by
+    several components (such as a resolved $ref) is only generated once.
+    $refs are resolved against the spec given to `resolver`.
     """
+    if cache is not None and id(schema_dict) in cache:
+        return cache[id(schema_dict)][1]
+
     example = {}
 
     if path is None:
         path = []
 
-    for property_name, property_value in schema_dict.items():
-        if property_value["type"] == "array":
-            if "oneOf" in property_value["items"]:
-                example[property_name] = [
-                    generate_resource_example(t["properties"], path + [property_name])
-                    for t in property_value["items"]["oneOf"]
-                ]
-            elif "anyOf" in property_value["items"]:
-                example[property_name] = [
-                    generate_resource_example(t["properties"], path + [property_name])
-                    for t in property_value["items"]["anyOf"]
-                ]
-            elif property_value["items"]["type"] == "object":
-                example[property_name] = [
-                    generate_resource_example(
-                        property_value["items"]["properties"], path + [property_name]
-                    )
-                ]
-            else:
-                if {"example", "default"} & set(property_value.get("items", {}).keys()):
-                    items = property_value["items"]
+    if resolver is None:
+        resolver = SchemaResolver({})
+
+    if id(schema_dict) in resolver._generating:
+        raise RuntimeError(f"{'.'.join(path)} contains itself, so has no finite example!")
+    resolver._generating.add(id(schema_dict))
+
+    try:
+        for property_name, property_value in schema_dict.items():
+            property_value = resolver.resolve(property_value)
+            property_path = path + [property_name]
+
+            if schema_type(property_value) == "array":
+                items = resolver.resolve(property_value.get("items", {}), one_of=False)
+
+                if "oneOf" in items or "anyOf" in items:
+                    alternatives = items["oneOf"] if "oneOf" in items else items["anyOf"]
                     example[property_name] = [
-                        items.get("example", items.get("default"))
+                        generate_schema_example(resolver.resolve(t), property_path, cache, resolver)
+                        for t in alternatives
+                    ]
+                elif schema_type(items) == "object":
+                    example[property_name] = [
+                        generate_resource_example(
+                            items["properties"], property_path, cache, resolver
+                        )
                     ]
-                elif ("example" not in property_value) and (
-                    "default" not in property_value
-                ):
-                    property_path = ".".join(path)
-                    raise RuntimeError(
-                        f"{property_path}.{property_name} has no example or default!"
-                    )
                 else:
-                    example[property_name] = property_value.get(
-                        "example", property_value.get("default")
+                    if {"example", "default"} & set(items.keys()):
+                        example[property_name] = [
+                            items.get("example", items.get("default"))
+                        ]
+                    elif ("example" not in property_value) and (
+                        "default" not in property_value
+                    ):
+                        raise RuntimeError(
+                            f"{'.'.join(property_path)} has no example or default!"
+                        )
+                    else:
+                        example[property_name] = property_value.get(
+                            "example", property_value.get("default")
+                        )
+            elif schema_type(property_value) == "object":
+                example[property_name] = generate_resource_example(
+                    property_value["properties"], property_path, cache, resolver
+                )
+            else:
+                if ("example" not in property_value) and ("default" not in property_value):
+                    raise RuntimeError(
+                        f"{'.'.join(property_path)} has no example or default!"
                     )
-        elif property_value["type"] == "object":
-            example[property_name] = generate_resource_example(
-                property_value["properties"], path + [property_name]
-            )
-        else:
-            if ("example" not in property_value) and ("default" not in property_value):
-                property_path = ".".join(path)
-                raise RuntimeError(
-                    f"{property_path}.{property_name} has no example or default!"
+                example[property_name] = property_value.get(
+                    "example", property_value.get("default")
                 )
-            example[property_name] = property_value.get(
-                "example", property_value.get("default")
-            )
+    finally:
+        resolver._generating.discard(id(schema_dict))
+
+    if cache is not None:
+        # Hold the schema too, so its id isn't reused while the cache is alive
+        cache[id(schema_dict)] = (schema_dict, example)
 
     return example
 
 
+def generate_schema_example(schema, path, cache, resolver):
+    """Generates the example for a resolved schema, from its properties or its own example or default"""
+    if schema_type(schema) == "object":
+        return generate_resource_example(schema["properties"], path, cache, resolver)
+
+    if ("example" not in schema) and ("default" not in schema):
+        raise RuntimeError(f"{'.'.join(path)} has no example or default!")
+
+    return schema.get("example", schema.get("default"))
+
+
+def generate_component_example(component_name, component_spec, cache, resolver):
+    """Returns the serialised example for a schema component"""
+    return json.dumps(
+        generate_schema_example(
+            resolver.resolve(component_spec), [component_name], cache, resolver
+        )
+    )
+
+
+def generate_resources(spec):
+    """Yields the name and serialised example of every schema component"""
+    cache = {}
+    resolver = SchemaResolver(spec)
+
+    for component_name, component_spec in spec["components"]["schemas"].items():
+        yield component_name, generate_component_example(
+            component_name, component_spec, cache, resolver
+        )
+
+
+def _dict_items(value):
+    """Returns the items of a dict, or nothing for any other JSON value"""
+    return value.items() if isinstance(value, dict) else ()
+
+
+def iter_response_examples(spec):
+    """
+    Yields (path, example) for every response example in the spec, in document order.
+
+    Matches paths.*.*.(response|(responses.*)).content.*.(example|(examples.*.value)),
+    with path a tuple of the keys below "paths". PATCHes are not FHIR
+    resources, so anything under a key containing "patch" is skipped
+    without being walked.
+    """
+    for path_name, path_item in _dict_items(spec.get("paths")):
+        if "patch" in path_name:
+            continue
+
+        for operation_name, operation in _dict_items(path_item):
+            if "patch" in operation_name or not isinstance(operation, dict):
+                continue
+
+            responses = []
+            if "response" in operation:
+                responses.append(((path_name, operation_name, "response"), operation["response"]))
+            for code, response in _dict_items(operation.get("responses")):
+                if "patch" not in code:
+                    responses.append(((path_name, operation_name, "responses", code), response))
+
+            for response_path, response in responses:
+                if not isinstance(response, dict):
+                    continue
+
+                for media_type, media in _dict_items(response.get("content")):
+                    if "patch" in media_type or not isinstance(media, dict):
+                        continue
+
+                    media_path = response_path + ("content", media_type)
+                    if "example" in media:
+                        yield media_path + ("example",), media["example"]
+
+                    for example_name, example in _dict_items(media.get("examples")):
+                        if "patch" not in example_name and isinstance(example, dict) and "value" in example:
+                            yield media_path + ("examples", example_name, "value"), example["value"]
+
+
+_WORKER_STATE = {}
+
+
+def _load_worker_spec(spec):
+    """Keeps the spec, a resolver and an example cache for the life of a worker process"""
+    _WORKER_STATE.update(spec=spec, cache={}, resolver=SchemaResolver(spec))
+
+
+def _generate_worker_resource(component_name):
+    """Generates the serialised example for one component in a worker process"""
+    state = _WORKER_STATE
+    component_spec = state["spec"]["components"]["schemas"][component_name]
+
+    return component_name, generate_component_example(
+        component_name, component_spec, state["cache"], state["resolver"]
+    )
+
+
+def generate_resources_in_pool(spec, workers):
+    """Yields the same as generate_resources, generating components across a pool of processes"""
+    names = list(spec["components"]["schemas"])
+    chunksize = max(1, len(names) // (workers * 4))
+
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_load_worker_spec, initargs=(spec,)
+    ) as executor:
+        yield from executor.map(_generate_worker_resource, names, chunksize=chunksize)
+
+
+class ExampleWriter:
+    """
+    Writes generated files under a directory, skipping any whose content hasn't changed.
+
+    The files written are listed in a manifest. finish() removes the files
+    listed by the previous run that weren't produced by this one, and saves
+    the manifest. Files the manifest never listed are left alone.
+    """
+
+    MANIFEST = ".examples-manifest.json"
+
+    def __init__(self, out_dir, sub_dirs=("resources", "responses")):
+        self.out_dir = out_dir
+        self.sub_dirs = sub_dirs
+        self.manifest_path = os.path.join(out_dir, self.MANIFEST)
+        self.previous = self._load_manifest()
+        self.current = set()
+        self.written = 0
+        self.unchanged = 0
+        self.removed = 0
+
+        for sub_dir in sub_dirs:
+            os.makedirs(os.path.join(out_dir, sub_dir), exist_ok=True)
+
+    def _load_manifest(self):
+        try:
+            with open(self.manifest_path, "r") as manifest_file:
+                manifest = json.load(manifest_file)
+        except (OSError, ValueError):
+            return set()
+
+        return set(manifest) if isinstance(manifest, (list, dict)) else set()
+
+    def _read(self, path):
+        try:
+            with open(path, "r") as existing_file:
+                return existing_file.read()
+        except (OSError, ValueError):
+            return None
+
+    def write(self, relative_path, content):
+        """Writes content to a path relative to the output directory, unless it is already there"""
+        path = os.path.join(self.out_dir, relative_path)
+
+        # A name produced twice in one run is always rewritten, so the last one wins
+        if relative_path not in self.current and self._read(path) == content:
+            self.unchanged += 1
+        else:
+            with open(path, "w") as out_file:
+                out_file.write(content)
+            self.written += 1
+
+        self.current.add(relative_path)
+
+    def finish(self):
+        """Removes the files the previous run wrote and this one didn't, and saves the manifest"""
+        for relative_path in sorted(self.previous - self.current):
+            try:
+                os.remove(os.path.join(self.out_dir, relative_path))
+            except FileNotFoundError:
+                continue
+            self.removed += 1
+
+        with open(self.manifest_path + ".tmp", "w") as manifest_file:
+            json.dump(sorted(self.current), manifest_file, indent=2)
+        os.replace(self.manifest_path + ".tmp", self.manifest_path)
+
+
 def main(arguments):
     """Program entry point"""
     arguments = docopt(__doc__, version="0")
@@ -86,42 +380,27 @@ def main(arguments):
         spec = json.loads(spec_file.read())
 
     # Create default dir structure
-    for i in ["resources", "responses"]:
-        os.makedirs(os.path.join(arguments["OUT_DIR"], i), exist_ok=True)
+    writer = ExampleWriter(arguments["OUT_DIR"])
 
     # Generate resources
-    for component_name, component_spec in spec["components"]["schemas"].items():
-        with open(
-            os.path.join(arguments["OUT_DIR"], "resources", component_name + ".json"),
-            "w",
-        ) as out_file:
-            out_file.write(
-                json.dumps(
-                    generate_resource_example(
-                        component_spec["properties"], [component_name]
-                    )
-                )
-            )
+    workers = int(arguments["--workers"])
+    if workers > 1:
+        resources = generate_resources_in_pool(spec, workers)
+    else:
+        resources = generate_resources(spec)
 
-    # Pull out responses
-    match_expr = parse(
-        "paths.*.*.(response|(responses.*)).content.*.(example|(examples.*.value))"
-    )
+    for component_name, resource in resources:
+        writer.write(os.path.join("resources", component_name + ".json"), resource)
 
-    for match in match_expr.find(spec):
-        if "patch" in str(match.full_path):
-            # PATCHes are not FHIR resources, so we should not be validating them
-            continue
+    # Pull out responses
+    for path, example in iter_response_examples(spec):
+        full_path = ".".join(("paths",) + path)
+        writer.write(
+            os.path.join("responses", full_path.replace("/", "_") + ".json"), json.dumps(example)
+        )
 
-        with open(
-            os.path.join(
-                arguments["OUT_DIR"],
-                "responses",
-                str(match.full_path).replace("/", "_") + ".json",
-            ),
-            "w",
-        ) as out_file:
-            out_file.write(json.dumps(match.value))
+    writer.finish()
+    print(f"{writer.written} written, {writer.unchanged} unchanged, {writer.removed} removed")
 
 
 if __name__ == "__main__":
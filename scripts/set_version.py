@@ -12,6 +12,10 @@ from calculate_version import calculate_version
 
 def main():
     """Main entrypoint"""
+    if "--help" in sys.argv[1:] or "-h" in sys.argv[1:]:
+        print(__doc__)
+        return
+
     data = json.loads(sys.stdin.read())
     data["info"]["version"] = str(calculate_version())
     sys.stdout.write(json.dumps(data, indent=2))
@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+"""
+validate_splunk_payloads.py
+
+Checks a corpus of captured Splunk payloads (the splunkCalloutRequest.content
+sent by the LogToSplunk shared flow) against splunk_logging_schema.json and
+the rules the Splunk logging tests assert: no deny-listed headers, header
+names in lower case, no headers duplicated under their own key and valid
+client sent timestamps.
+
+The corpus is newline-delimited JSON, one payload per line. Use - to read it
+from stdin. Exits non-zero if any payload breaks a rule. Run it as a module
+from the repository root, python -m scripts.validate_splunk_payloads, so
+the rules are imported from tests.utils.splunk.
+
+Usage:
+  validate_splunk_payloads.py CORPUS [--workers=<n>] [--chunk-size=<n>] [--examples=<n>]
+
+Options:
+  --workers=<n>     Worker processes [default: 4]
+  --chunk-size=<n>  Payloads sent to a worker at a time [default: 1000]
+  --examples=<n>    Line numbers to show for each rule [default: 5]
+"""
+import itertools
+import json
+import sys
+
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from docopt import docopt
+from tests.utils.splunk import RULES, validate_payloads
+
+
+def check_chunk(first_line_number, lines, max_examples):
+    """Checks a chunk of corpus lines, returning violation counts and example line numbers per rule"""
+    counts = Counter()
+    examples = {}
+
+    def record(line_number, violations):
+        for rule, errors in violations.items():
+            if errors:
+                counts[rule] += 1
+                rule_examples = examples.setdefault(rule, [])
+                if len(rule_examples) < max_examples:
+                    rule_examples.append((line_number, errors[0]))
+
+    payloads = []
+    for line_number, line in enumerate(lines, start=first_line_number):
+        if not line.strip():
+            continue
+
+        try:
+            payloads.append((line_number, json.loads(line)))
+        except ValueError as e:
+            record(line_number, {"invalid_json": [str(e)]})
+
+    # The schema is checked for the whole chunk at once, and the other rules a payload at a time
+    schema_violations = validate_payloads(payload for _, payload in payloads)
+    for index, (line_number, payload) in enumerate(payloads):
+        record(
+            line_number,
+            {
+                rule: schema_violations.get(index, []) if rule == "schema" else check(payload)
+                for rule, check in RULES.items()
+            },
+        )
+
+    return len(lines), counts, examples
+
+
+def chunked(lines, chunk_size):
+    """Yields (first line number, lines) chunks from a stream of lines"""
+    line_number = 1
+    while True:
+        chunk = list(itertools.islice(lines, chunk_size))
+        if not chunk:
+            return
+        yield line_number, chunk
+        line_number += len(chunk)
+
+
+def validate_corpus(lines, workers, chunk_size, max_examples):
+    """Fans the corpus out over a process pool, keeping a bounded number of chunks in flight"""
+    total = 0
+    counts = Counter()
+    examples = {}
+
+    def merge(future):
+        nonlocal total
+        chunk_total, chunk_counts, chunk_examples = future.result()
+        total += chunk_total
+        counts.update(chunk_counts)
+        # Chunks can finish in any order, so keep the earliest examples
+        for rule, rule_examples in chunk_examples.items():
+            examples[rule] = sorted(examples.get(rule, []) + rule_examples)[:max_examples]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        in_flight = set()
+        for first_line_number, chunk in chunked(lines, chunk_size):
+            if len(in_flight) >= workers * 2:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    merge(future)
+            in_flight.add(executor.submit(check_chunk, first_line_number, chunk, max_examples))
+
+        for future in in_flight:
+            merge(future)
+
+    return total, counts, examples
+
+
+def main(arguments):
+    """Program entry point"""
+    corpus = arguments["CORPUS"]
+    stream = sys.stdin if corpus == "-" else open(corpus, "r")
+
+    with stream:
+        total, counts, examples = validate_corpus(
+            stream,
+            workers=int(arguments["--workers"]),
+            chunk_size=int(arguments["--chunk-size"]),
+            max_examples=int(arguments["--examples"]),
+        )
+
+    print(f"Checked {total} lines")
+    for rule in itertools.chain(RULES, ["invalid_json"]):
+        if rule == "invalid_json" and not counts[rule]:
+            continue
+        print(f"{rule}: {counts[rule]} violating payloads")
+        for line_number, error in examples.get(rule, []):
+            print(f"  line {line_number}: {error}")
+
+    return 1 if counts else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(arguments=docopt(__doc__, version="0")))
@@ -3,11 +3,20 @@
 yaml2json.py
 
 Takes yaml on stdin and writes json on stdout, converting dates correctly.
+
+With --stream, stdin is parsed as it is read with the safe loader (the C
+implementation when PyYAML was built with libyaml) and the json is written
+out as it is encoded, rather than holding the input and output in memory
+as whole strings. The output is the same.
+
+Usage:
+  yaml2json.py [--stream]
 """
 import sys
 import json
 import datetime
 import yaml
+from docopt import docopt
 
 
 def date_converter(obj):
@@ -19,12 +28,24 @@ def date_converter(obj):
     return obj
 
 
-def main():
+def convert(stream, out):
+    """Reads yaml from a file and writes json to another, a chunk at a time"""
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    data = yaml.load(stream, Loader=loader)
+    encoder = json.JSONEncoder(default=date_converter, indent=2)
+    out.writelines(encoder.iterencode(data))
+
+
+def main(stream=False):
     """Main entrypoint"""
-    data = yaml.load(Loader=yaml.FullLoader, stream=sys.stdin.read())
-    sys.stdout.write(json.dumps(data, default=date_converter, indent=2))
+    if stream:
+        convert(sys.stdin, sys.stdout)
+    else:
+        data = yaml.load(Loader=yaml.FullLoader, stream=sys.stdin.read())
+        sys.stdout.write(json.dumps(data, default=date_converter, indent=2))
     sys.stdout.close()
 
 
 if __name__ == "__main__":
-    main()
+    args = docopt(__doc__)
+    main(stream=args["--stream"])
@@ -1,6 +1,52 @@
 import pytest
 
 from tests.utils.config import ENV
+from tests.utils.http import PooledSession
+from tests.utils.trace import DebugSessions
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--load-rps",
+        type=float,
+        default=None,
+        help="Run the tests marked load at this many requests per second",
+    )
+    parser.addoption(
+        "--load-duration",
+        type=float,
+        default=30,
+        help="How long each load test drives its endpoint, in seconds",
+    )
+    parser.addoption(
+        "--benchmark-rounds",
+        type=int,
+        default=None,
+        help="Run the tests marked benchmark with this many request pairs per endpoint",
+    )
+    parser.addoption(
+        "--benchmark-json",
+        default="shared-flow-overhead.json",
+        help="Where the benchmark tests write their results",
+    )
+
+
+# Opt-in markers and the option that enables them
+OPT_IN_MARKERS = {
+    "load": "--load-rps",
+    "benchmark": "--benchmark-rounds",
+}
+
+
+def pytest_collection_modifyitems(config, items):
+    for marker, option in OPT_IN_MARKERS.items():
+        if config.getoption(option):
+            continue
+
+        skip = pytest.mark.skip(reason=f"{marker} tests only run with {option}")
+        for item in items:
+            if marker in item.keywords:
+                item.add_marker(skip)
 
 
 # FIXTURES FOR USE IN SET UP OF pytest_nhsd_apim
@@ -12,3 +58,30 @@ def nhsd_apim_api_name():
 @pytest.fixture(scope="session")
 def nhsd_apim_proxy_name():
     return ENV["proxy_name"]
+
+
+@pytest.fixture(scope="session")
+def http_session():
+    """A keep-alive HTTP session shared by every test. Use it instead of requests.get/post."""
+    with PooledSession(
+        pool_size=ENV["http_pool_size"], timeout=ENV["http_timeout"]
+    ) as session:
+        yield session
+
+
+@pytest.fixture(scope="module")
+def _debug_sessions(worker_id):
+    # Prefix names with the pytest-xdist worker so parallel runs can't collide
+    with DebugSessions(name_prefix=f"{worker_id}-") as sessions:
+        yield sessions
+
+
+@pytest.fixture()
+def debug_session(trace, _debug_sessions):
+    """
+    A debug session filtered on a unique trace_id header.
+
+    Send debug_session.header_filters with the request under test. The
+    session is deleted with the rest of the module's sessions at teardown.
+    """
+    return _debug_sessions.open(trace)
@@ -0,0 +1,62 @@
+import importlib.util
+import os.path
+import pytest
+
+SCRIPT_PATH = os.path.join(os.path.dirname(__file__), "..", "scripts", "calculate_version.py")
+
+
+@pytest.fixture(scope="module")
+def calculate_version():
+    pytest.importorskip("semver")
+    spec = importlib.util.spec_from_file_location("calculate_version", SCRIPT_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(scope="module")
+def history(calculate_version):
+    """A short history, newest first, with the files each commit changed"""
+    CommitRecord = calculate_version.CommitRecord
+    return [
+        CommitRecord("Change sandbox", 1, "tree5", "sha5", ["sandbox/app.py"]),
+        CommitRecord("+minor Add endpoint", 1, "tree4", "sha4", ["proxies/live/x.xml"]),
+        CommitRecord("Empty", 1, "tree2", "sha3", []),
+        CommitRecord("Move", 1, "tree2", "sha2", ["proxies/a.xml", "sandbox/a.xml"]),
+        CommitRecord("Initial", 0, "tree1", "sha1", ["proxies/b.xml", "sandbox/b.xml"]),
+    ]
+
+
+class TestCalculateVersion:
+    """Test the version engine against injected streams of CommitRecords"""
+
+    def test_calculate_version(self, calculate_version, history):
+        assert calculate_version.calculate_version(commits=history) == "v1.1.1-alpha"
+
+    def test_calculate_versions_by_path(self, calculate_version, history):
+        Target = calculate_version.Target
+        targets = [
+            Target("all"),
+            Target("proxies", ("proxies/",)),
+            Target("sandbox", ("sandbox",), base_major=2, base_pre=None),
+        ]
+
+        assert calculate_version.calculate_versions(targets, history) == {
+            "all": "v1.1.1-alpha",
+            "proxies": "v1.1.0-alpha",
+            "sandbox": "v2.0.2",
+        }
+
+    def test_calculate_versions_needs_unique_names(self, calculate_version, history):
+        Target = calculate_version.Target
+
+        with pytest.raises(ValueError, match="unique"):
+            calculate_version.calculate_versions([Target("a"), Target("a")], history)
+
+    def test_calculate_versions_needs_files_for_paths(self, calculate_version, history):
+        records = [commit._replace(files=None) for commit in history]
+
+        with pytest.raises(ValueError, match="needs the files changed"):
+            calculate_version.calculate_versions(
+                [calculate_version.Target("proxies", ("proxies",))], records
+            )
@@ -1,7 +1,6 @@
 from os import getenv
 
 import pytest
-import requests
 
 
 class TestEnhancedVerifyApiKey:
@@ -10,6 +9,7 @@ class TestEnhancedVerifyApiKey:
     @pytest.mark.parametrize("expected_status_code, expected_message", [(200, "share-flow-testing")])
     def test_valid_api_key_products_subscribed(
         self,
+        http_session,
         _create_function_scoped_test_app,
         _proxy_product_with_scope,
         nhsd_apim_proxy_url,
@@ -35,7 +35,7 @@ class TestEnhancedVerifyApiKey:
         access_token = getenv("APIGEE_ACCESS_TOKEN")
 
         # POST apiProducts to app
-        update_app_resp = requests.post(
+        update_app_resp = http_session.post(
             url=url,
             json=json_data,
             headers={"Authorization": f"Bearer {access_token}", "Content-Type": "application/json"},
@@ -44,7 +44,7 @@ class TestEnhancedVerifyApiKey:
 
         assert update_app_resp.status_code == expected_status_code
 
-        proxy_resp = requests.get(
+        proxy_resp = http_session.get(
             url=f"{nhsd_apim_proxy_url}/enhanced-verify-api-key",
             headers={"apikey": apikey},
             timeout=60
@@ -56,6 +56,7 @@ class TestEnhancedVerifyApiKey:
     @pytest.mark.parametrize("expected_status_code, expected_message", [(401, "no_products")])
     def test_valid_api_key_no_subscribed_products(
         self,
+        http_session,
         _create_function_scoped_test_app,
         nhsd_apim_proxy_url,
         expected_status_code,
@@ -65,7 +66,7 @@ class TestEnhancedVerifyApiKey:
         app = _create_function_scoped_test_app
         apikey = app["credentials"][0]["consumerKey"]
 
-        proxy_resp = requests.get(
+        proxy_resp = http_session.get(
             url=f"{nhsd_apim_proxy_url}/enhanced-verify-api-key",
             headers={"apikey": apikey},
             timeout=60
@@ -77,6 +78,7 @@ class TestEnhancedVerifyApiKey:
     @pytest.mark.parametrize("expected_status_code, expected_message", [(401, "ApiKey not approved")])
     def test_revoked_api_key(
         self,
+        http_session,
         _create_function_scoped_test_app,
         nhsd_apim_proxy_url,
         nhsd_apim_config,
@@ -95,7 +97,7 @@ class TestEnhancedVerifyApiKey:
         )
 
         access_token = getenv("APIGEE_ACCESS_TOKEN")
-        update_app_resp = requests.post(
+        update_app_resp = http_session.post(
             url=url,
             headers={"Authorization": f"Bearer {access_token}"},
             timeout=60
@@ -104,7 +106,7 @@ class TestEnhancedVerifyApiKey:
         expected_resp = [200, 204]
         assert update_app_resp.status_code in expected_resp
 
-        proxy_resp = requests.get(
+        proxy_resp = http_session.get(
             url=f"{nhsd_apim_proxy_url}/enhanced-verify-api-key",
             headers={"apikey": apikey},
             timeout=60
@@ -120,11 +122,12 @@ class TestEnhancedVerifyApiKey:
     ])
     def test_invalid_api_key(
         self,
+        http_session,
         nhsd_apim_proxy_url,
         expected_status_code,
         apikey,
     ):
-        proxy_resp = requests.get(
+        proxy_resp = http_session.get(
             url=f"{nhsd_apim_proxy_url}/enhanced-verify-api-key",
             headers={"apikey": apikey},
             timeout=60
@@ -135,6 +138,7 @@ class TestEnhancedVerifyApiKey:
     @pytest.mark.parametrize("expected_status_code, expected_message", [(401, "Invalid ApiKey for given resource")])
     def test_valid_api_key_incorrect_product(
         self,
+        http_session,
         _create_function_scoped_test_app,
         nhsd_apim_proxy_url,
         nhsd_apim_config,
@@ -159,7 +163,7 @@ class TestEnhancedVerifyApiKey:
         access_token = getenv("APIGEE_ACCESS_TOKEN")
 
         # POST apiProducts to app
-        update_app_resp = requests.post(
+        update_app_resp = http_session.post(
             url=url,
             json=json_data,
             headers={"Authorization": f"Bearer {access_token}", "Content-Type": "application/json"},
@@ -168,7 +172,7 @@ class TestEnhancedVerifyApiKey:
 
         assert update_app_resp.status_code == 200
 
-        proxy_resp = requests.get(
+        proxy_resp = http_session.get(
             url=f"{nhsd_apim_proxy_url}/enhanced-verify-api-key",
             headers={"apikey": apikey},
             timeout=60
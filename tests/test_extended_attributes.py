@@ -1,19 +1,17 @@
 import pytest
-import requests
 import jwt
 
 from uuid import uuid4
 from time import time
 
 from tests.utils.config import ENV
-from tests.utils.helpers import get_variable_from_trace
 
 
 class TestExtendedAttributes:
     """Test extended attributes are available"""
 
     @staticmethod
-    def _get_token_client_credentials(client_id, private_key):
+    def _get_token_client_credentials(http_session, client_id, private_key):
         claims = {
             "sub": client_id,
             "iss": client_id,
@@ -31,7 +29,7 @@ class TestExtendedAttributes:
             "grant_type": "client_credentials",
         }
 
-        token_resp = requests.post(
+        token_resp = http_session.post(
             ENV["oauth_base_uri"] + "/token",
             headers={"Content-Type": "application/x-www-form-urlencoded"},
             data=token_data,
@@ -67,13 +65,14 @@ class TestExtendedAttributes:
     )
     def test_extended_attributes(
         self,
+        http_session,
         nhsd_apim_proxy_url,
         _create_function_scoped_test_app,
         _proxy_product_with_scope,
         _jwt_keys,
         developer_apps_api,
         nhsd_apim_config,
-        trace,
+        debug_session,
         new_attribute,
         flow_vars_to_check,
     ):
@@ -86,69 +85,57 @@ class TestExtendedAttributes:
         )
 
         # Trace call to shared flow proxy extended attributes endpoint
-        session_name = str(uuid4())
-        header_filters = {"trace_id": session_name}
-        trace.post_debugsession(session=session_name, header_filters=header_filters)
-
         access_token = self._get_token_client_credentials(
+            http_session,
             client_id=app["credentials"][0]["consumerKey"],
             private_key=_jwt_keys["private_key_pem"],
         )
-        proxy_resp = requests.get(
+        proxy_resp = http_session.get(
             url=f"{nhsd_apim_proxy_url}/extended-attributes",
-            headers={"Authorization": f"Bearer {access_token}", **header_filters},
+            headers={"Authorization": f"Bearer {access_token}", **debug_session.header_filters},
         )
         assert proxy_resp.status_code == 200
 
         # Extract variables from trace and assert
-        extended_attributes = get_variable_from_trace(
-            trace, session_name, "app." + new_attribute["name"]
-        )
+        snapshot = debug_session.collect()
+
+        extended_attributes = snapshot.get("app." + new_attribute["name"])
         assert extended_attributes == new_attribute["value"]
 
+        flow_vars = snapshot.with_prefix(new_attribute["name"] + ".")
         for flow_var in flow_vars_to_check:
-            assert flow_var["value"] == get_variable_from_trace(
-                trace, session_name, flow_var["name"]
-            )
-
-        trace.delete_debugsession_by_name(session_name)
+            assert flow_var["value"] == flow_vars.get(flow_var["name"])
 
     @pytest.mark.nhsd_apim_authorization(access="application", level="level3")
     def test_no_attribute(
         self,
+        http_session,
         nhsd_apim_proxy_url,
         nhsd_apim_auth_headers,
-        trace,
+        debug_session,
     ):
         # Trace call to shared flow proxy extended attributes endpoint
-        session_name = str(uuid4())
-        header_filters = {"trace_id": session_name}
-        trace.post_debugsession(session=session_name, header_filters=header_filters)
-
-        proxy_resp = requests.get(
+        proxy_resp = http_session.get(
             url=f"{nhsd_apim_proxy_url}/extended-attributes",
-            headers={**nhsd_apim_auth_headers, **header_filters},
+            headers={**nhsd_apim_auth_headers, **debug_session.header_filters},
         )
         assert proxy_resp.status_code == 200
 
         # Extract variable from trace and assert
-        extended_attributes = get_variable_from_trace(
-            trace, session_name, "app.apim-app-flow-vars"
-        )
-
-        trace.delete_debugsession_by_name(session_name)
+        extended_attributes = debug_session.collect().get("app.apim-app-flow-vars")
 
         assert not extended_attributes
 
     def test_invalid_json(
         self,
+        http_session,
         nhsd_apim_proxy_url,
         _create_function_scoped_test_app,
         _proxy_product_with_scope,
         _jwt_keys,
         developer_apps_api,
         nhsd_apim_config,
-        trace,
+        debug_session,
     ):
         new_attribute = {
             "name": "apim-app-flow-vars",
@@ -164,25 +151,18 @@ class TestExtendedAttributes:
         )
 
         # Trace call to shared flow proxy extended attributes endpoint
-        session_name = str(uuid4())
-        header_filters = {"trace_id": session_name}
-        trace.post_debugsession(session=session_name, header_filters=header_filters)
-
         access_token = self._get_token_client_credentials(
+            http_session,
             client_id=app["credentials"][0]["consumerKey"],
             private_key=_jwt_keys["private_key_pem"],
         )
-        proxy_resp = requests.get(
+        proxy_resp = http_session.get(
             url=f"{nhsd_apim_proxy_url}/extended-attributes",
-            headers={"Authorization": f"Bearer {access_token}", **header_filters},
+            headers={"Authorization": f"Bearer {access_token}", **debug_session.header_filters},
         )
         assert proxy_resp.status_code == 500
 
         # Var is None unless the InvalidJson RaiseFault error has been thrown
-        raise_fault_var = get_variable_from_trace(
-            trace, session_name, "raisefault.RaiseFault.InvalidJson"
-        )
-
-        trace.delete_debugsession_by_name(session_name)
+        raise_fault_var = debug_session.collect().get("raisefault.RaiseFault.InvalidJson")
 
         assert raise_fault_var is not None
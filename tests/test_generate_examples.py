@@ -0,0 +1,69 @@
+import importlib.util
+import json
+import os.path
+import pytest
+
+SCRIPT_PATH = os.path.join(os.path.dirname(__file__), "..", "scripts", "generate_examples.py")
+
+SPEC = {
+    "components": {
+        "schemas": {
+            "Id": {"type": "string", "example": "9000000009"},
+            "Status": {"type": "string", "enum": ["active", "inactive"], "default": "active"},
+            "Identifier": {
+                "type": "object",
+                "properties": {"value": {"$ref": "#/components/schemas/Id"}},
+            },
+            "Patient": {
+                "type": "object",
+                "properties": {
+                    "id": {"$ref": "#/components/schemas/Id"},
+                    "status": {"$ref": "#/components/schemas/Status"},
+                    "identifiers": {
+                        "type": "array",
+                        "items": {
+                            "oneOf": [
+                                {"$ref": "#/components/schemas/Identifier"},
+                                {"$ref": "#/components/schemas/Id"},
+                            ]
+                        },
+                    },
+                },
+            },
+        }
+    }
+}
+
+
+@pytest.fixture(scope="module")
+def generate_examples():
+    pytest.importorskip("docopt")
+    spec = importlib.util.spec_from_file_location("generate_examples", SCRIPT_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class TestGenerateExamples:
+    """Test resource examples are generated through $refs to scalar schemas"""
+
+    def test_scalar_ref_in_items_one_of(self, generate_examples):
+        resources = dict(generate_examples.generate_resources(SPEC))
+
+        assert json.loads(resources["Patient"]) == {
+            "id": "9000000009",
+            "status": "active",
+            "identifiers": [{"value": "9000000009"}, "9000000009"],
+        }
+
+    def test_scalar_component(self, generate_examples):
+        resources = dict(generate_examples.generate_resources(SPEC))
+
+        assert json.loads(resources["Id"]) == "9000000009"
+        assert json.loads(resources["Status"]) == "active"
+
+    def test_scalar_component_without_example(self, generate_examples):
+        spec = {"components": {"schemas": {"Code": {"type": "string"}}}}
+
+        with pytest.raises(RuntimeError, match="Code has no example or default!"):
+            dict(generate_examples.generate_resources(spec))
@@ -0,0 +1,58 @@
+import pytest
+
+from tests.utils.load import run_load
+
+USER_ROLE_AUTHORIZATION = pytest.mark.nhsd_apim_authorization(
+    access="healthcare_worker",
+    level="aal3",
+    login_form={"username": "656005750107"},
+)
+
+
+@pytest.mark.load
+class TestLoad:
+    """Drive the proxy endpoints at a fixed rate and report latency, errors and 429 onset"""
+
+    @pytest.mark.parametrize(
+        "endpoint",
+        [
+            pytest.param("/_ping", id="_ping"),
+            pytest.param("/open-access", id="open-access"),
+            pytest.param(
+                "/apikey-protected",
+                marks=pytest.mark.nhsd_apim_authorization(access="application", level="level0"),
+                id="apikey-protected",
+            ),
+            pytest.param(
+                "/splunk-test",
+                marks=pytest.mark.nhsd_apim_authorization(access="application", level="level3"),
+                id="splunk-test",
+            ),
+            pytest.param("/user-role-service", marks=USER_ROLE_AUTHORIZATION, id="user-role-service"),
+            pytest.param(
+                "/user-role-service-v2-default-header",
+                marks=USER_ROLE_AUTHORIZATION,
+                id="user-role-service-v2-default-header",
+            ),
+            pytest.param(
+                "/user-role-service-v2-custom-header",
+                marks=USER_ROLE_AUTHORIZATION,
+                id="user-role-service-v2-custom-header",
+            ),
+        ],
+    )
+    def test_load(
+        self, pytestconfig, nhsd_apim_proxy_url, nhsd_apim_auth_headers, record_property, endpoint
+    ):
+        report = run_load(
+            url=nhsd_apim_proxy_url + endpoint,
+            headers=nhsd_apim_auth_headers,
+            rps=pytestconfig.getoption("--load-rps"),
+            duration=pytestconfig.getoption("--load-duration"),
+        )
+
+        summary = report.summary()
+        for name, value in summary.items():
+            record_property(name, value)
+
+        assert summary["requests"] > 0
@@ -0,0 +1,49 @@
+import importlib.util
+import io
+import json
+import os.path
+import pytest
+
+SCRIPT_PATH = os.path.join(
+    os.path.dirname(__file__), "..", ".github", "scripts", "sbom_json_to_csv.py"
+)
+
+SBOM = {
+    "spdxVersion": "SPDX-2.3",
+    "creationInfo": {"created": "2024-01-01T00:00:00Z", "ratio": 1.5, "scores": [-2.5e+10, 3E-2]},
+    "packages": [
+        {"name": "a", "versionInfo": "1.0", "size": 12345, "ratio": 0.125, "weight": -1e-7},
+        {"name": "b", "versionInfo": "2.0", "flags": [True, False, None], "ratio": 1.5},
+        {"name": "c", "versionInfo": "3.0", "nested": {"deep": [1, 22, 333.25, "x" * 40]}},
+    ],
+    "relationships": [{"ratio": 1.5, "count": 100}],
+}
+
+
+@pytest.fixture(scope="module")
+def sbom_json_to_csv():
+    pytest.importorskip("tabulate")
+    spec = importlib.util.spec_from_file_location("sbom_json_to_csv", SCRIPT_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class TestSbomJsonToCsv:
+    """Test the streaming SBOM reader against json.loads"""
+
+    @pytest.mark.parametrize("indent", [None, 2])
+    def test_packages_at_every_chunk_size(self, sbom_json_to_csv, indent):
+        document = json.dumps(SBOM, indent=indent)
+
+        # Small chunk sizes cut every number, string and literal at every offset
+        for chunk_size in [*range(1, 40), 64, 1 << 16]:
+            packages = list(sbom_json_to_csv.iter_packages(io.StringIO(document), chunk_size))
+            assert packages == SBOM["packages"], f"chunk_size={chunk_size}"
+
+    def test_number_split_after_decimal_point(self, sbom_json_to_csv):
+        # "1." ends the first chunk, which on its own decodes as the int 1
+        document = '{"ratio": 1.5, "packages": [{"name": "a"}]}'
+
+        packages = sbom_json_to_csv.iter_packages(io.StringIO(document), len('{"ratio": 1.'))
+        assert list(packages) == [{"name": "a"}]
@@ -0,0 +1,104 @@
+import json
+import pytest
+
+from datetime import datetime, timezone
+
+from tests.utils.benchmark import measure_pairs, overhead_summary
+
+BASELINE_ENDPOINT = "/open-access"
+
+# /open-access and /enhanced-verify-api-key route to the target, whose
+# SpikeArrest allows 5 requests a second, so keep well under that
+REQUEST_INTERVAL = 0.25
+
+USER_ROLE_AUTHORIZATION = pytest.mark.nhsd_apim_authorization(
+    access="healthcare_worker",
+    level="aal3",
+    login_form={"username": "656005750107"},
+)
+
+
+@pytest.fixture(scope="module")
+def overhead_results(pytestconfig):
+    results = {}
+    yield results
+
+    if results:
+        with open(pytestconfig.getoption("--benchmark-json"), "w") as f:
+            json.dump(
+                {
+                    "generated_at": datetime.now(timezone.utc).isoformat(),
+                    "baseline": BASELINE_ENDPOINT,
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+
+
+@pytest.mark.benchmark
+class TestSharedFlowOverhead:
+    """Measure the latency each shared flow adds over the bare /open-access flow"""
+
+    @pytest.mark.parametrize(
+        "shared_flow,endpoint",
+        [
+            pytest.param(
+                "UserRoleService",
+                "/user-role-service",
+                marks=USER_ROLE_AUTHORIZATION,
+                id="UserRoleService",
+            ),
+            pytest.param(
+                "UserRoleServiceV2",
+                "/user-role-service-v2-default-header",
+                marks=USER_ROLE_AUTHORIZATION,
+                id="UserRoleServiceV2 default header",
+            ),
+            pytest.param(
+                "UserRoleServiceV2",
+                "/user-role-service-v2-custom-header",
+                marks=USER_ROLE_AUTHORIZATION,
+                id="UserRoleServiceV2 custom header",
+            ),
+            pytest.param(
+                "ExtendedAttributes",
+                "/extended-attributes",
+                marks=pytest.mark.nhsd_apim_authorization(access="application", level="level3"),
+                id="ExtendedAttributes",
+            ),
+            pytest.param(
+                "EnhancedVerifyApiKey",
+                "/enhanced-verify-api-key",
+                marks=pytest.mark.nhsd_apim_authorization(access="application", level="level0"),
+                id="EnhancedVerifyApiKey",
+            ),
+        ],
+    )
+    def test_shared_flow_overhead(
+        self,
+        pytestconfig,
+        http_session,
+        nhsd_apim_proxy_url,
+        nhsd_apim_auth_headers,
+        overhead_results,
+        record_property,
+        shared_flow,
+        endpoint,
+    ):
+        pairs = measure_pairs(
+            http_session,
+            baseline=(nhsd_apim_proxy_url + BASELINE_ENDPOINT, {}),
+            candidate=(nhsd_apim_proxy_url + endpoint, nhsd_apim_auth_headers),
+            rounds=pytestconfig.getoption("--benchmark-rounds"),
+            interval=REQUEST_INTERVAL,
+        )
+
+        # Timings of error responses say nothing about the shared flow
+        statuses = {(b, c) for _, _, b, c in pairs}
+        assert statuses == {(200, 200)}, f"Unexpected status codes: {statuses}"
+
+        summary = {"shared_flow": shared_flow, **overhead_summary(pairs)}
+        overhead_results[endpoint] = summary
+        for name, value in summary.items():
+            record_property(name, value)
@@ -1,41 +1,19 @@
-import requests
 import pytest
 from tests.utils.config import ENV
+from tests.utils.readiness import wait_for_commit
 
 
 class TestHealthEndpoints:
     """Test ping and status endpoints to check health"""
 
     @pytest.mark.smoketest
-    def test_ping(self, nhsd_apim_proxy_url):
-        resp = requests.get(f"{nhsd_apim_proxy_url}/_ping")
+    def test_ping(self, http_session, nhsd_apim_proxy_url):
+        resp = http_session.get(f"{nhsd_apim_proxy_url}/_ping")
         assert resp.status_code == 200
 
     @pytest.mark.smoketest
-    def test_wait_for_ping(self, nhsd_apim_proxy_url):
-        retries = 0
-        resp = requests.get(f"{nhsd_apim_proxy_url}/_ping")
-        deployed_commitId = resp.json().get("commitId")
-
-        while (
-            deployed_commitId != ENV["source_commit_id"]
-            and retries <= 30
-            and resp.status_code == 200
-        ):
-            resp = requests.get(f"{nhsd_apim_proxy_url}/_ping")
-            deployed_commitId = resp.json().get("commitId")
-            retries += 1
-
-        if resp.status_code != 200:
-            pytest.fail(f"Status code {resp.status_code}, expecting 200")
-        elif retries >= 30:
-            pytest.fail("Timeout Error - max retries")
-
-        assert deployed_commitId == ENV["source_commit_id"]
-
-    @pytest.mark.smoketest
-    def test_status(self, nhsd_apim_proxy_url, status_endpoint_auth_headers):
-        resp = requests.get(
+    def test_status(self, http_session, nhsd_apim_proxy_url, status_endpoint_auth_headers):
+        resp = http_session.get(
             f"{nhsd_apim_proxy_url}/_status", headers=status_endpoint_auth_headers
         )
         assert resp.status_code == 200
@@ -50,30 +28,28 @@ class TestHealthEndpoints:
         assert body["checks"]["healthcheck"]["outcome"] == "Hello, Guest!"
 
     @pytest.mark.smoketest
-    def test_wait_for_status(self, nhsd_apim_proxy_url, status_endpoint_auth_headers):
-        retries = 0
-        resp = requests.get(
-            f"{nhsd_apim_proxy_url}/_status", headers=status_endpoint_auth_headers
+    @pytest.mark.asyncio
+    async def test_wait_for_ping_and_status(
+        self, nhsd_apim_proxy_url, status_endpoint_auth_headers, record_property
+    ):
+        results = await wait_for_commit(
+            {
+                "_ping": (f"{nhsd_apim_proxy_url}/_ping", {}),
+                "_status": (f"{nhsd_apim_proxy_url}/_status", status_endpoint_auth_headers),
+            },
+            commit_id=ENV["source_commit_id"],
+            timeout=ENV["readiness_timeout"],
         )
-        deployed_commitId = resp.json().get("commitId")
 
-        while (
-            deployed_commitId != ENV["source_commit_id"]
-            and retries <= 30
-            and resp.status_code == 200
-            and resp.json().get("version")
-        ):
-            resp = requests.get(
-                f"{nhsd_apim_proxy_url}/_status", headers=status_endpoint_auth_headers
-            )
-            deployed_commitId = resp.json().get("commitId")
-            retries += 1
+        for result in results.values():
+            record_property(f"{result.name}_seconds_to_ready", round(result.elapsed, 2))
 
-        if resp.status_code != 200:
-            pytest.fail(f"Status code {resp.status_code}, expecting 200")
-        elif retries >= 30:
-            pytest.fail("Timeout Error - max retries")
-        elif not resp.json().get("version"):
-            pytest.fail("version not found")
+            if result.error is not None:
+                pytest.fail(f"{result.name}: {result.error!r}")
+            elif result.status_code != 200:
+                pytest.fail(f"{result.name}: status code {result.status_code}, expecting 200")
+            elif result.commit_id != ENV["source_commit_id"]:
+                pytest.fail(f"{result.name}: Timeout Error - deployed commit is {result.commit_id}")
 
-        assert deployed_commitId == ENV["source_commit_id"]
+        if not results["_status"].body.get("version"):
+            pytest.fail("version not found")
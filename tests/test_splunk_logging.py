@@ -3,13 +3,69 @@ import hashlib
 import hmac
 import json
 import pytest
-import requests
-
-from jsonschema import validate
-from uuid import uuid4
 
 from tests.utils.config import ENV
-from tests.utils.helpers import get_variable_from_trace
+from tests.utils.helpers import authorization_key
+from tests.utils.splunk import DENIED_HEADERS, schema_errors
+
+
+# Sent with every captured request so the header handling tests can share it.
+# test-header-* are overwritten in the AssignMessage.Swap.RequestHeaders policy
+# on the /splunk-test endpoint with the value: this is not the original message
+CAPTURED_REQUEST_HEADERS = {
+    "test-header-one": "foo bar bar foo",
+    "test-header-two": "bar foo foo bar",
+    "UPPERCASE-HEADER": "foo bar bar foo",
+    "Mixedcase-Header": "bar foo bar foo",
+    "lowercase-header": "far boo far boo",
+}
+
+
+@pytest.fixture(scope="module")
+def _captured_splunk_payloads():
+    return {}
+
+
+@pytest.fixture()
+def captured_splunk_payload(
+    request,
+    http_session,
+    _captured_splunk_payloads,
+    _debug_sessions,
+    nhsd_apim_proxy_url,
+):
+    """
+    Returns the Splunk payload logged for a GET to an endpoint.
+
+    The request is sent, traced and parsed once per module for each
+    authorization marker and endpoint, then shared. Only use it in tests
+    that read the payload and don't depend on credentials of their own.
+    """
+    marker = request.node.get_closest_marker("nhsd_apim_authorization")
+    authorization = (marker.args[0] if marker.args else marker.kwargs) if marker else None
+
+    def capture(endpoint):
+        key = (authorization_key(authorization), endpoint)
+        if key not in _captured_splunk_payloads:
+            auth_headers = request.getfixturevalue("nhsd_apim_auth_headers")
+            session = _debug_sessions.open(request.getfixturevalue("trace"))
+
+            http_session.get(
+                url=nhsd_apim_proxy_url + endpoint,
+                headers={
+                    **auth_headers,
+                    **CAPTURED_REQUEST_HEADERS,
+                    **session.header_filters,
+                },
+            )
+
+            _captured_splunk_payloads[key] = json.loads(
+                session.collect().get("splunkCalloutRequest.content")
+            )
+
+        return _captured_splunk_payloads[key]
+
+    return capture
 
 
 class TestSplunkLogging:
@@ -27,84 +83,24 @@ class TestSplunkLogging:
         access="healthcare_worker",
         level="aal3",
         login_form={"username": "656005750104"},
-        force_new_token=True,
     )
-    def test_splunk_payload_schema(
-        self,
-        nhsd_apim_auth_headers,
-        nhsd_apim_proxy_url,
-        trace,
-    ):
-        session_name = str(uuid4())
-        header_filters = {"trace_id": session_name}
-        trace.post_debugsession(session=session_name, header_filters=header_filters)
-
-        requests.get(
-            url=f"{nhsd_apim_proxy_url}/splunk-test",
-            headers={**nhsd_apim_auth_headers, **header_filters},
-        )
+    def test_splunk_payload_schema(self, captured_splunk_payload):
+        payload = captured_splunk_payload("/splunk-test")
 
-        payload = json.loads(
-            get_variable_from_trace(trace, session_name, "splunkCalloutRequest.content")
-        )
+        errors = schema_errors(payload)
+        assert not errors, errors
 
-        trace.delete_debugsession_by_name(session_name)
-
-        with open("tests/utils/splunk_logging_schema.json") as f:
-            schema = json.load(f)
-
-        # If no exception is raised by validate(), the instance is valid.
-        validate(instance=payload, schema=schema)
-
-    def test_splunk_payload_client_sent_timestamp(
-        self,
-        nhsd_apim_auth_headers,
-        nhsd_apim_proxy_url,
-        trace,
-    ):
-        session_name = str(uuid4())
-        header_filters = {"trace_id": session_name}
-        trace.post_debugsession(session=session_name, header_filters=header_filters)
-
-        requests.get(
-            url=f"{nhsd_apim_proxy_url}/splunk-test",
-            headers={**nhsd_apim_auth_headers, **header_filters},
-        )
-
-        payload = json.loads(
-            get_variable_from_trace(trace, session_name, "splunkCalloutRequest.content")
-        )
-
-        trace.delete_debugsession_by_name(session_name)
+    def test_splunk_payload_client_sent_timestamp(self, captured_splunk_payload):
+        payload = captured_splunk_payload("/splunk-test")
 
         assert int(payload["client"]["sent_start"]) > 0
         assert int(payload["client"]["sent_end"]) > 0
 
-    def test_splunk_payload_schema_open_access(
-        self,
-        nhsd_apim_proxy_url,
-        trace,
-    ):
-        session_name = str(uuid4())
-        header_filters = {"trace_id": session_name}
-        trace.post_debugsession(session=session_name, header_filters=header_filters)
-
-        requests.get(
-            url=f"{nhsd_apim_proxy_url}/open-access",
-            headers=header_filters,
-        )
-
-        payload = json.loads(
-            get_variable_from_trace(trace, session_name, "splunkCalloutRequest.content")
-        )
-
-        trace.delete_debugsession_by_name(session_name)
-
-        with open("tests/utils/splunk_logging_schema.json") as f:
-            schema = json.load(f)
+    def test_splunk_payload_schema_open_access(self, captured_splunk_payload):
+        payload = captured_splunk_payload("/open-access")
 
-        # If no exception is raised by validate(), the instance is valid.
-        validate(instance=payload, schema=schema)
+        errors = schema_errors(payload)
+        assert not errors, errors
 
     @pytest.mark.parametrize(
         "expected_attr",
@@ -117,9 +113,7 @@ class TestSplunkLogging:
                     "provider": "apim",
                     "user_id": "",
                 },
-                marks=pytest.mark.nhsd_apim_authorization(
-                    access="application", level="level3", force_new_token=True
-                ),
+                marks=pytest.mark.nhsd_apim_authorization(access="application", level="level3"),
                 id="Client credentials",
             ),
             pytest.param(
@@ -134,7 +128,6 @@ class TestSplunkLogging:
                     access="healthcare_worker",
                     level="aal3",
                     login_form={"username": "656005750104"},
-                    force_new_token=True,
                 ),
                 id="Authorization Code: CIS2",
             ),
@@ -150,7 +143,6 @@ class TestSplunkLogging:
                     access="patient",
                     level="P9",
                     login_form={"username": "9912003071"},
-                    force_new_token=True,
                 ),
                 id="Authorization Code: NHS Login",
             ),
@@ -167,7 +159,6 @@ class TestSplunkLogging:
                     level="aal3",
                     login_form={"username": "656005750104"},
                     authentication="separate",
-                    force_new_token=True,
                 ),
                 id="Token exchange: CIS2",
             ),
@@ -184,33 +175,26 @@ class TestSplunkLogging:
                     level="P9",
                     login_form={"username": "9912003071"},
                     authentication="separate",
-                    force_new_token=True,
                 ),
                 id="Token exchange: NHS Login",
             ),
         ],
     )
     def test_splunk_auth_attributes(
-        self, _nhsd_apim_auth_token_data, nhsd_apim_proxy_url, trace, expected_attr
+        self, http_session, _nhsd_apim_auth_token_data, nhsd_apim_proxy_url, debug_session, expected_attr
     ):
         access_token = _nhsd_apim_auth_token_data["access_token"]
         expected_hashed_token = self._calculate_hmac_sha512(access_token)
 
-        session_name = str(uuid4())
-        header_filters = {"trace_id": session_name}
-        trace.post_debugsession(session=session_name, header_filters=header_filters)
-
-        requests.get(
+        http_session.get(
             url=f"{nhsd_apim_proxy_url}/splunk-test",
-            headers={"Authorization": f"Bearer {access_token}", **header_filters},
+            headers={"Authorization": f"Bearer {access_token}", **debug_session.header_filters},
         )
 
         payload = json.loads(
-            get_variable_from_trace(trace, session_name, "splunkCalloutRequest.content")
+            debug_session.collect().get("splunkCalloutRequest.content")
         )
 
-        trace.delete_debugsession_by_name(session_name)
-
         auth = payload["auth"]
         assert auth["access_token_hash"] == expected_hashed_token
 
@@ -223,32 +207,25 @@ class TestSplunkLogging:
         auth_user = auth["user"]
         assert auth_user["user_id"] == expected_attr["user_id"]
 
-    @pytest.mark.nhsd_apim_authorization(
-        access="application", level="level0", force_new_token=True
-    )
+    @pytest.mark.nhsd_apim_authorization(access="application", level="level0")
     def test_splunk_auth_attributes_api_key(
         self,
+        http_session,
         _nhsd_apim_auth_token_data,
         nhsd_apim_proxy_url,
-        trace,
+        debug_session,
     ):
         api_key = _nhsd_apim_auth_token_data["apikey"]
 
-        session_name = str(uuid4())
-        header_filters = {"trace_id": session_name}
-        trace.post_debugsession(session=session_name, header_filters=header_filters)
-
-        requests.get(
+        http_session.get(
             url=f"{nhsd_apim_proxy_url}/apikey-protected",
-            headers={"apikey": api_key, **header_filters},
+            headers={"apikey": api_key, **debug_session.header_filters},
         )
 
         payload = json.loads(
-            get_variable_from_trace(trace, session_name, "splunkCalloutRequest.content")
+            debug_session.collect().get("splunkCalloutRequest.content")
         )
 
-        trace.delete_debugsession_by_name(session_name)
-
         auth = payload["auth"]
         assert auth["access_token_hash"] == ""
 
@@ -266,26 +243,21 @@ class TestSplunkLogging:
 
     def test_splunk_auth_attributes_invalid_api_key(
         self,
+        http_session,
         nhsd_apim_proxy_url,
-        trace,
+        debug_session,
     ):
         api_key = "invalid api key"
 
-        session_name = str(uuid4())
-        header_filters = {"trace_id": session_name}
-        trace.post_debugsession(session=session_name, header_filters=header_filters)
-
-        requests.get(
+        http_session.get(
             url=f"{nhsd_apim_proxy_url}/apikey-protected",
-            headers={"apikey": api_key, **header_filters},
+            headers={"apikey": api_key, **debug_session.header_filters},
         )
 
         payload = json.loads(
-            get_variable_from_trace(trace, session_name, "splunkCalloutRequest.content")
+            debug_session.collect().get("splunkCalloutRequest.content")
         )
 
-        trace.delete_debugsession_by_name(session_name)
-
         auth = payload["auth"]
         assert auth["access_token_hash"] == ""
 
@@ -304,21 +276,8 @@ class TestSplunkLogging:
         assert meta["product"] == ""
 
     @pytest.mark.parametrize("endpoint", ["/open-access", "/_ping"])
-    def test_splunk_attributes_open_access(self, nhsd_apim_proxy_url, trace, endpoint):
-        session_name = str(uuid4())
-        header_filters = {"trace_id": session_name}
-        trace.post_debugsession(session=session_name, header_filters=header_filters)
-
-        requests.get(
-            url=nhsd_apim_proxy_url + endpoint,
-            headers=header_filters,
-        )
-
-        payload = json.loads(
-            get_variable_from_trace(trace, session_name, "splunkCalloutRequest.content")
-        )
-
-        trace.delete_debugsession_by_name(session_name)
+    def test_splunk_attributes_open_access(self, captured_splunk_payload, endpoint):
+        payload = captured_splunk_payload(endpoint)
 
         auth = payload["auth"]
         assert auth["access_token_hash"] == ""
@@ -344,25 +303,19 @@ class TestSplunkLogging:
         ],
     )
     def test_splunk_auth_attributes_invalid_token(
-        self, access_token, nhsd_apim_proxy_url, trace
+        self, http_session, access_token, nhsd_apim_proxy_url, debug_session
     ):
         expected_hashed_token = "empty"
 
-        session_name = str(uuid4())
-        header_filters = {"trace_id": session_name}
-        trace.post_debugsession(session=session_name, header_filters=header_filters)
-
-        requests.get(
+        http_session.get(
             url=f"{nhsd_apim_proxy_url}/splunk-test",
-            headers={"Authorization": f"Bearer {access_token}", **header_filters},
+            headers={"Authorization": f"Bearer {access_token}", **debug_session.header_filters},
         )
 
         payload = json.loads(
-            get_variable_from_trace(trace, session_name, "splunkCalloutRequest.content")
+            debug_session.collect().get("splunkCalloutRequest.content")
         )
 
-        trace.delete_debugsession_by_name(session_name)
-
         auth = payload["auth"]
         assert auth["access_token_hash"] == expected_hashed_token
 
@@ -380,47 +333,20 @@ class TestSplunkLogging:
         assert meta["application"] == "unknown"
         assert meta["product"] == ""
 
-    @pytest.mark.nhsd_apim_authorization(
-        access="application", level="level3", force_new_token=True
-    )
+    @pytest.mark.nhsd_apim_authorization(access="application", level="level3")
     @pytest.mark.parametrize("message_type", ["request", "response"])
     def test_splunk_deny_list_headers_not_logged(
-        self, _nhsd_apim_auth_token_data, nhsd_apim_proxy_url, trace, message_type
+        self, captured_splunk_payload, message_type
     ):
-        access_token = _nhsd_apim_auth_token_data["access_token"]
-
-        session_name = str(uuid4())
-        header_filters = {"trace_id": session_name}
-        trace.post_debugsession(session=session_name, header_filters=header_filters)
-
-        requests.get(
-            url=f"{nhsd_apim_proxy_url}/splunk-test",
-            headers={"Authorization": f"Bearer {access_token}", **header_filters},
-        )
-
-        payload = json.loads(
-            get_variable_from_trace(trace, session_name, "splunkCalloutRequest.content")
-        )
-
-        trace.delete_debugsession_by_name(session_name)
+        payload = captured_splunk_payload("/splunk-test")
 
         content = payload[message_type]
         assert content["headers"]
 
-        deny_list = [
-            "accept-coding",
-            "accept-language",
-            "authorization",
-            "connection",
-            "cookie",
-            "strict-transport-security",
-        ]
-        for denied_header in deny_list:
+        for denied_header in DENIED_HEADERS:
             assert denied_header not in content["headers"]
 
-    @pytest.mark.nhsd_apim_authorization(
-        access="application", level="level3", force_new_token=True
-    )
+    @pytest.mark.nhsd_apim_authorization(access="application", level="level3")
     @pytest.mark.parametrize(
         "message_type,headers_already_logged",
         [
@@ -460,28 +386,11 @@ class TestSplunkLogging:
     )
     def test_splunk_headers_already_logged_not_duplicated(
         self,
-        _nhsd_apim_auth_token_data,
-        nhsd_apim_proxy_url,
-        trace,
+        captured_splunk_payload,
         message_type,
         headers_already_logged,
     ):
-        access_token = _nhsd_apim_auth_token_data["access_token"]
-
-        session_name = str(uuid4())
-        header_filters = {"trace_id": session_name}
-        trace.post_debugsession(session=session_name, header_filters=header_filters)
-
-        requests.get(
-            url=f"{nhsd_apim_proxy_url}/splunk-test",
-            headers={"Authorization": f"Bearer {access_token}", **header_filters},
-        )
-
-        payload = json.loads(
-            get_variable_from_trace(trace, session_name, "splunkCalloutRequest.content")
-        )
-
-        trace.delete_debugsession_by_name(session_name)
+        payload = captured_splunk_payload("/splunk-test")
 
         content = payload[message_type]
         assert content["headers"]
@@ -490,35 +399,12 @@ class TestSplunkLogging:
             assert logged_header["header_name"] not in content["headers"]
             assert content[logged_header["splunk_key"]] is not None
 
-    @pytest.mark.nhsd_apim_authorization(
-        access="application", level="level3", force_new_token=True
-    )
+    @pytest.mark.nhsd_apim_authorization(access="application", level="level3")
     def test_splunk_request_headers_not_overwritten_in_proxy(
-        self, _nhsd_apim_auth_token_data, nhsd_apim_proxy_url, trace
+        self, captured_splunk_payload
     ):
-        access_token = _nhsd_apim_auth_token_data["access_token"]
-
-        session_name = str(uuid4())
-        header_filters = {"trace_id": session_name}
-        trace.post_debugsession(session=session_name, header_filters=header_filters)
-
-        # test-header-* are overwritten in the AssignMessage.Swap.RequestHeaders policy
-        # on this endpoint with the value: this is not the original message
-        requests.get(
-            url=f"{nhsd_apim_proxy_url}/splunk-test",
-            headers={
-                "Authorization": f"Bearer {access_token}",
-                "test-header-one": "foo bar bar foo",
-                "test-header-two": "bar foo foo bar",
-                **header_filters,
-            },
-        )
-
-        splunk_payload = json.loads(
-            get_variable_from_trace(trace, session_name, "splunkCalloutRequest.content")
-        )
-
-        trace.delete_debugsession_by_name(session_name)
+        # The captured request sends CAPTURED_REQUEST_HEADERS, including test-header-*
+        splunk_payload = captured_splunk_payload("/splunk-test")
 
         content = splunk_payload["request"]
         assert content["headers"]
@@ -528,34 +414,10 @@ class TestSplunkLogging:
         assert headers["test-header-one"] == "foo bar bar foo"
         assert headers["test-header-two"] == "bar foo foo bar"
 
-    @pytest.mark.nhsd_apim_authorization(
-        access="application", level="level3", force_new_token=True
-    )
-    def test_splunk_headers_logged_lower_case(
-        self, _nhsd_apim_auth_token_data, nhsd_apim_proxy_url, trace
-    ):
-        access_token = _nhsd_apim_auth_token_data["access_token"]
-
-        session_name = str(uuid4())
-        header_filters = {"trace_id": session_name}
-        trace.post_debugsession(session=session_name, header_filters=header_filters)
-
-        requests.get(
-            url=f"{nhsd_apim_proxy_url}/splunk-test",
-            headers={
-                "Authorization": f"Bearer {access_token}",
-                "UPPERCASE-HEADER": "foo bar bar foo",
-                "Mixedcase-Header": "bar foo bar foo",
-                "lowercase-header": "far boo far boo",
-                **header_filters,
-            },
-        )
-
-        splunk_payload = json.loads(
-            get_variable_from_trace(trace, session_name, "splunkCalloutRequest.content")
-        )
-
-        trace.delete_debugsession_by_name(session_name)
+    @pytest.mark.nhsd_apim_authorization(access="application", level="level3")
+    def test_splunk_headers_logged_lower_case(self, captured_splunk_payload):
+        # The captured request sends CAPTURED_REQUEST_HEADERS, including mixed case headers
+        splunk_payload = captured_splunk_payload("/splunk-test")
 
         content = splunk_payload["request"]
         assert content["headers"]
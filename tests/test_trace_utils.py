@@ -0,0 +1,119 @@
+import json
+import pytest
+
+from tests.utils.fake_trace import FakeDebugSessions, make_transaction
+from tests.utils.helpers import get_variable_from_trace
+from tests.utils.splunk import check_payload
+from tests.utils.trace import DebugSessions, TraceCollector, TraceSnapshot
+
+SPLUNK_PAYLOAD = {
+    "messageID": "rrt-0123456789",
+    "client": {
+        "ip": "10.0.0.1",
+        "received_start": "1700000000000",
+        "received_end": "1700000000001",
+        "sent_start": "1700000000010",
+        "sent_end": "1700000000011",
+        "user_agent": "python-requests",
+    },
+    "request": {
+        "headers": {"accept": "*/*", "test-header-one": "foo bar bar foo"},
+        "uri": "/shared-flow-testing/splunk-test",
+        "verb": "GET",
+        "content_type": "",
+        "content_length": "0",
+        "content_encoding": "",
+        "requestID": "",
+        "correlationID": "",
+        "host": "internal-dev.api.service.nhs.uk",
+        "port": "443",
+    },
+    "response": {"headers": {"x-frame-options": "DENY"}},
+}
+
+
+class TestTraceUtils:
+    """Test the trace helpers against an in-process fake of the debug sessions API"""
+
+    def test_snapshot_indexes_variables(self):
+        trace = FakeDebugSessions([make_transaction({"a": "1", "b": "2"})])
+        trace.post_debugsession(session="session")
+
+        snapshot = TraceSnapshot.fetch(trace, "session")
+
+        assert snapshot.get("a") == "1"
+        assert snapshot.get_many(["a", "b", "c"]) == {"a": "1", "b": "2", "c": None}
+
+    def test_snapshot_uses_last_write(self):
+        data = make_transaction({"a": "1"})
+        data["point"][0]["results"][0]["accessList"][:0] = [{"Get": {"name": "a", "value": "0"}}]
+        data["point"][0]["results"][0]["accessList"].append({"Set": {"name": "a", "value": "2"}})
+        trace = FakeDebugSessions([data])
+        trace.post_debugsession(session="session")
+
+        snapshot = TraceSnapshot.fetch(trace, "session")
+
+        assert snapshot.get("a") == "2"
+        assert snapshot.index().writes("a") == ["1", "2"]
+        assert snapshot.index().first("a") == trace.get_apigee_variable_from_trace("a", data) == "0"
+
+    def test_snapshot_prefix_query(self):
+        trace = FakeDebugSessions([
+            make_transaction({
+                "apim-app-flow-vars.attr_a": "value_a",
+                "apim-app-flow-vars.attr_b": "value_b",
+                "app.apim-app-flow-vars": "{}",
+            })
+        ])
+        trace.post_debugsession(session="session")
+
+        assert get_variable_from_trace(trace, "session", "app.apim-app-flow-vars") == "{}"
+        assert TraceSnapshot.fetch(trace, "session").with_prefix("apim-app-flow-vars.") == {
+            "apim-app-flow-vars.attr_a": "value_a",
+            "apim-app-flow-vars.attr_b": "value_b",
+        }
+
+    def test_collector_waits_for_transactions(self):
+        trace = FakeDebugSessions([make_transaction({"a": "1"})], ready_after=3)
+        trace.post_debugsession(session="session")
+
+        snapshot = TraceCollector(trace, initial_delay=0.001).collect("session")
+
+        assert snapshot.get("a") == "1"
+        assert trace.sessions["session"]["polls"] == 4
+
+    def test_collector_times_out(self):
+        trace = FakeDebugSessions()
+        trace.post_debugsession(session="session")
+
+        with pytest.raises(TimeoutError):
+            TraceCollector(trace, timeout=0.05, initial_delay=0.001).collect("session")
+
+    def test_debug_sessions_are_deleted_in_batches(self):
+        trace = FakeDebugSessions()
+
+        with DebugSessions(name_prefix="gw0-", max_open=2) as sessions:
+            opened = [sessions.open(trace) for _ in range(3)]
+            assert len(trace.deleted) == 2
+
+        assert sorted(trace.deleted) == sorted(session.name for session in opened)
+        assert all(session.name.startswith("gw0-") for session in opened)
+        assert opened[0].header_filters == {"trace_id": opened[0].name}
+
+    def test_splunk_payload_rules(self):
+        trace = FakeDebugSessions(
+            [make_transaction({"splunkCalloutRequest.content": json.dumps(SPLUNK_PAYLOAD)})]
+        )
+
+        with DebugSessions() as sessions:
+            session = sessions.open(trace)
+            payload = json.loads(session.collect().get("splunkCalloutRequest.content"))
+
+        errors = check_payload(payload)
+        assert "/: 'meta' is a required property" in errors.pop("schema")
+        assert errors == {
+            "denied_headers": [],
+            "header_case": [],
+            "duplicated_headers": [],
+            "client_sent_timestamps": [],
+        }
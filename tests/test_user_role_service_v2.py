@@ -1,5 +1,4 @@
 import pytest
-import requests
 
 HAPPY_PATH_PARAMS = [
     pytest.param(
@@ -9,7 +8,6 @@ HAPPY_PATH_PARAMS = [
             access="healthcare_worker",
             level="aal3",
             login_form={"username": "656005750107"},
-            force_new_token=True,
         ),
         id="User role sent in id token",
     ),
@@ -20,7 +18,6 @@ HAPPY_PATH_PARAMS = [
             access="healthcare_worker",
             level="aal3",
             login_form={"username": "787807429512"},
-            force_new_token=True,
         ),
         id="User role in user info - one role - (no header, not in id token)",
     ),
@@ -31,7 +28,6 @@ HAPPY_PATH_PARAMS = [
             access="healthcare_worker",
             level="aal3",
             login_form={"username": "656005750104"},
-            force_new_token=True,
         ),
         id="User role sent in header (no in id token, multiple in user info)",
     ),
@@ -45,7 +41,6 @@ UNHAPPY_PATH_PARAMS = [
             access="healthcare_worker",
             level="aal3",
             login_form={"username": "656005750104"},
-            force_new_token=True,
         ),
         id="Multiple user roles found in userinfo",
     ),
@@ -57,7 +52,6 @@ UNHAPPY_PATH_PARAMS = [
             access="healthcare_worker",
             level="aal3",
             login_form={"username": "Aal3"},
-            force_new_token=True,
         ),
         id="No user role provided by any means",
     ),
@@ -82,7 +76,6 @@ UNHAPPY_PATH_PARAMS = [
             access="healthcare_worker",
             level="aal3",
             login_form={"username": "Aal5"},
-            force_new_token=True,
         ),
         id="nrbac is malformed, or person_roleid is empty (in userinfo)",
     ),
@@ -94,7 +87,6 @@ UNHAPPY_PATH_PARAMS = [
             access="healthcare_worker",
             level="aal3",
             login_form={"username": "656005750104"},
-            force_new_token=True,
         ),
         id="Invalid role in header",
     ),
@@ -108,7 +100,6 @@ WHEN_NOT_CIS2_PARAMS = [
             access="patient",
             level="P9",
             login_form={"username": "9912003071"},
-            force_new_token=True,
         ),
         id="NHS Login combined: Role can't be used from token",
     ),
@@ -120,7 +111,6 @@ WHEN_NOT_CIS2_PARAMS = [
             access="patient",
             level="P9",
             login_form={"username": "9912003071"},
-            force_new_token=True,
         ),
         id="NHS Login combined: Can't use header to fetch from userinfo",
     ),
@@ -134,7 +124,6 @@ SEPARATE_AUTH_HAPPY_PARAMS = [
             level="aal3",
             login_form={"username": "656005750104"},
             authentication="separate",
-            force_new_token=True,
         ),
         id="CIS2 separate: User role sent in header",
     ),
@@ -147,12 +136,13 @@ class TestUserRoles:
     @pytest.mark.parametrize("additional_headers,expected_urid", HAPPY_PATH_PARAMS)
     def test_user_role_happy_path_default_header(
         self,
+        http_session,
         nhsd_apim_proxy_url,
         nhsd_apim_auth_headers,
         additional_headers,
         expected_urid,
     ):
-        resp = requests.get(
+        resp = http_session.get(
             url=f"{nhsd_apim_proxy_url}/user-role-service-v2-default-header",
             headers={**nhsd_apim_auth_headers, **additional_headers},
         )
@@ -163,12 +153,13 @@ class TestUserRoles:
     @pytest.mark.parametrize("additional_headers,expected_urid", HAPPY_PATH_PARAMS)
     def test_user_role_happy_path_custom_header(
         self,
+        http_session,
         nhsd_apim_proxy_url,
         nhsd_apim_auth_headers,
         additional_headers,
         expected_urid,
     ):
-        resp = requests.get(
+        resp = http_session.get(
             url=f"{nhsd_apim_proxy_url}/user-role-service-v2-custom-header",
             headers={**nhsd_apim_auth_headers, **additional_headers},
         )
@@ -181,13 +172,14 @@ class TestUserRoles:
     )
     def test_user_role_unhappy_path_default_header(
         self,
+        http_session,
         nhsd_apim_proxy_url,
         nhsd_apim_auth_headers,
         additional_headers,
         error_description,
         status_code,
     ):
-        resp = requests.get(
+        resp = http_session.get(
             url=f"{nhsd_apim_proxy_url}/user-role-service-v2-default-header",
             headers={**nhsd_apim_auth_headers, **additional_headers},
         )
@@ -200,13 +192,14 @@ class TestUserRoles:
     )
     def test_user_role_unhappy_path_custom_header(
         self,
+        http_session,
         nhsd_apim_proxy_url,
         nhsd_apim_auth_headers,
         additional_headers,
         error_description,
         status_code,
     ):
-        resp = requests.get(
+        resp = http_session.get(
             url=f"{nhsd_apim_proxy_url}/user-role-service-v2-custom-header",
             headers={**nhsd_apim_auth_headers, **additional_headers},
         )
@@ -219,13 +212,14 @@ class TestUserRoles:
     )
     def test_error_when_not_cis2_combined_auth_default_header(
         self,
+        http_session,
         nhsd_apim_proxy_url,
         nhsd_apim_auth_headers,
         additional_headers,
         error_description,
         status_code,
     ):
-        resp = requests.get(
+        resp = http_session.get(
             url=f"{nhsd_apim_proxy_url}/user-role-service-v2-default-header",
             headers={**nhsd_apim_auth_headers, **additional_headers},
         )
@@ -238,13 +232,14 @@ class TestUserRoles:
     )
     def test_error_when_not_cis2_combined_auth_custom_header(
         self,
+        http_session,
         nhsd_apim_proxy_url,
         nhsd_apim_auth_headers,
         additional_headers,
         error_description,
         status_code,
     ):
-        resp = requests.get(
+        resp = http_session.get(
             url=f"{nhsd_apim_proxy_url}/user-role-service-v2-custom-header",
             headers={**nhsd_apim_auth_headers, **additional_headers},
         )
@@ -255,6 +250,7 @@ class TestUserRoles:
     @pytest.mark.parametrize("additional_headers,expected_urid", SEPARATE_AUTH_HAPPY_PARAMS)
     def test_separate_auth_happy_path_default_header(
         self,
+        http_session,
         nhsd_apim_proxy_url,
         nhsd_apim_auth_headers,
         additional_headers,
@@ -263,7 +259,7 @@ class TestUserRoles:
         """Due to the nature of separate auth (token_exchange), we can't use custom headers and we do not do any
         specific validation. Therefore we can only test for the happy path returning a 200 response"""
 
-        resp = requests.get(
+        resp = http_session.get(
             url=f"{nhsd_apim_proxy_url}/user-role-service-v2-default-header",
             headers={**nhsd_apim_auth_headers, **additional_headers},
         )
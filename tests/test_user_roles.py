@@ -1,5 +1,4 @@
 import pytest
-import requests
 
 
 class TestUserRoles:
@@ -14,7 +13,6 @@ class TestUserRoles:
                     access="healthcare_worker",
                     level="aal3",
                     login_form={"username": "656005750107"},
-                    force_new_token=True,
                 ),
                 id="User role sent in id token",
             ),
@@ -24,7 +22,6 @@ class TestUserRoles:
                     access="healthcare_worker",
                     level="aal3",
                     login_form={"username": "787807429512"},
-                    force_new_token=True,
                 ),
                 id="User role in user info - one role - (no header, not in id token)",
             ),
@@ -34,7 +31,6 @@ class TestUserRoles:
                     access="healthcare_worker",
                     level="aal3",
                     login_form={"username": "656005750104"},
-                    force_new_token=True,
                 ),
                 id="User role sent in header (no in id token, multiple in user info)",
             ),
@@ -45,16 +41,15 @@ class TestUserRoles:
                     level="aal3",
                     login_form={"username": "656005750104"},
                     authentication="separate",
-                    force_new_token=True,
                 ),
                 id="CIS2 separate: User role sent in header",
             ),
         ],
     )
     def test_user_role_happy_path(
-        self, nhsd_apim_proxy_url, nhsd_apim_auth_headers, additional_headers
+        self, http_session, nhsd_apim_proxy_url, nhsd_apim_auth_headers, additional_headers
     ):
-        resp = requests.get(
+        resp = http_session.get(
             url=f"{nhsd_apim_proxy_url}/user-role-service",
             headers={**nhsd_apim_auth_headers, **additional_headers},
         )
@@ -71,7 +66,6 @@ class TestUserRoles:
                     access="healthcare_worker",
                     level="aal3",
                     login_form={"username": "656005750104"},
-                    force_new_token=True,
                 ),
                 id="Multiple user roles found in userinfo",
             ),
@@ -82,7 +76,6 @@ class TestUserRoles:
                     access="healthcare_worker",
                     level="aal3",
                     login_form={"username": "Aal3"},
-                    force_new_token=True,
                 ),
                 id="No user role provided by any means",
             ),
@@ -105,7 +98,6 @@ class TestUserRoles:
                     access="healthcare_worker",
                     level="aal3",
                     login_form={"username": "Aal5"},
-                    force_new_token=True,
                 ),
                 id="nrbac is malformed, or person_roleid is empty (in userinfo)",
             ),
@@ -116,7 +108,6 @@ class TestUserRoles:
                     access="healthcare_worker",
                     level="aal3",
                     login_form={"username": "656005750104"},
-                    force_new_token=True,
                 ),
                 id="Invalid role in header",
             ),
@@ -127,7 +118,6 @@ class TestUserRoles:
                     access="patient",
                     level="P9",
                     login_form={"username": "9912003071"},
-                    force_new_token=True,
                 ),
                 id="NHS Login combined: Role can't be used from token",
             ),
@@ -138,7 +128,6 @@ class TestUserRoles:
                     access="patient",
                     level="P9",
                     login_form={"username": "9912003071"},
-                    force_new_token=True,
                 ),
                 id="NHS Login combined: Can't use header to fetch from userinfo",
             ),
@@ -146,12 +135,13 @@ class TestUserRoles:
     )
     def test_user_role_unhappy_path(
         self,
+        http_session,
         nhsd_apim_proxy_url,
         nhsd_apim_auth_headers,
         additional_headers,
         error_description,
     ):
-        resp = requests.get(
+        resp = http_session.get(
             url=f"{nhsd_apim_proxy_url}/user-role-service",
             headers={**nhsd_apim_auth_headers, **additional_headers},
         )
@@ -0,0 +1,77 @@
+"""
+Paired latency measurements of an endpoint against a baseline endpoint.
+"""
+import random
+import statistics
+import time
+
+
+def measure_pairs(session, baseline, candidate, rounds, interval):
+    """
+    Times `rounds` matched pairs of GETs to the baseline and candidate.
+
+    `baseline` and `candidate` are (url, headers) pairs. The order within
+    each pair is shuffled so neither side always gets the warmer
+    connection, and requests are spaced by `interval` seconds. Returns a
+    list of (baseline_seconds, candidate_seconds, baseline_status,
+    candidate_status) tuples.
+    """
+    rng = random.Random(0)
+    pairs = []
+
+    for _ in range(rounds):
+        timings = {}
+        for name in rng.sample(["baseline", "candidate"], 2):
+            url, headers = baseline if name == "baseline" else candidate
+
+            started = time.perf_counter()
+            resp = session.get(url, headers=headers)
+            timings[name] = (time.perf_counter() - started, resp.status_code)
+
+            time.sleep(interval)
+
+        pairs.append(
+            (
+                timings["baseline"][0],
+                timings["candidate"][0],
+                timings["baseline"][1],
+                timings["candidate"][1],
+            )
+        )
+
+    return pairs
+
+
+def bootstrap_ci(values, statistic=statistics.median, confidence=0.95, resamples=2000, seed=0):
+    """Percentile bootstrap confidence interval for a statistic of values"""
+    rng = random.Random(seed)
+    estimates = sorted(
+        statistic(rng.choices(values, k=len(values))) for _ in range(resamples)
+    )
+    tail = (1 - confidence) / 2
+
+    return estimates[int(tail * resamples)], estimates[int((1 - tail) * resamples) - 1]
+
+
+def overhead_summary(pairs, confidence=0.95):
+    """
+    Summarises the latency the candidate adds over the baseline, in milliseconds.
+
+    The added latency is the median of the per-pair differences, which
+    cancels out drift in network conditions over the run and isn't thrown
+    by the odd slow request.
+    """
+    baseline = [b * 1000 for b, _, _, _ in pairs]
+    candidate = [c * 1000 for _, c, _, _ in pairs]
+    differences = [c - b for b, c in zip(baseline, candidate)]
+    ci_low, ci_high = bootstrap_ci(differences, confidence=confidence)
+
+    return {
+        "pairs": len(pairs),
+        "baseline_median_ms": round(statistics.median(baseline), 2),
+        "median_ms": round(statistics.median(candidate), 2),
+        "added_median_ms": round(statistics.median(differences), 2),
+        "added_ci_low_ms": round(ci_low, 2),
+        "added_ci_high_ms": round(ci_high, 2),
+        "confidence": confidence,
+    }
@@ -7,4 +7,7 @@ ENV = {
     "source_commit_id": getenv("SOURCE_COMMIT_ID"),
     "oauth_base_uri": getenv("OAUTH_BASE_URI"),
     "access_token_hash_secret": getenv("ACCESS_TOKEN_HASH_SECRET"),
+    "http_pool_size": int(getenv("HTTP_POOL_SIZE", "10")),
+    "http_timeout": float(getenv("HTTP_TIMEOUT", "60")),
+    "readiness_timeout": float(getenv("READINESS_TIMEOUT", "120")),
 }
@@ -0,0 +1,90 @@
+"""
+An in-process stand-in for the Apigee debug sessions API.
+"""
+from uuid import uuid4
+
+from tests.utils.trace import index_variables
+
+
+def make_transaction(variables):
+    """Builds transaction data in Apigee's trace format in which each variable was Set"""
+    return {
+        "completed": True,
+        "point": [
+            {
+                "id": "Execution",
+                "results": [
+                    {
+                        "ActionResult": "VariableAccess",
+                        "accessList": [
+                            {"Set": {"name": name, "success": True, "value": value}}
+                            for name, value in variables.items()
+                        ],
+                    }
+                ],
+            }
+        ],
+    }
+
+
+class FakeDebugSessions:
+    """
+    Implements the parts of pytest_nhsd_apim's DebugSessionsAPI the tests use.
+
+    Every session opened gets a copy of `transactions`, and more can be
+    added to a session with record(). A session's transactions only show
+    up once it has been polled `ready_after` times, to mimic the delay
+    before Apigee makes them available. Unknown sessions raise, as the
+    real API does.
+    """
+
+    def __init__(self, transactions=None, ready_after=0):
+        self.transactions = transactions or []
+        self.ready_after = ready_after
+        self.sessions = {}
+        self.deleted = []
+
+    def _session(self, session_name):
+        if session_name not in self.sessions:
+            raise Exception(f"Debug session {session_name} does not exist")
+        return self.sessions[session_name]
+
+    def post_debugsession(self, session="default", header_filters={}, qparam_filters={}):
+        self.sessions[session] = {
+            "header_filters": dict(header_filters),
+            "qparam_filters": dict(qparam_filters),
+            "polls": 0,
+            "transactions": {},
+        }
+        for data in self.transactions:
+            self.record(session, data)
+
+        return {"name": session}
+
+    def record(self, session_name, data):
+        """Adds a transaction to a session, returning its id"""
+        transaction_id = str(uuid4())
+        self._session(session_name)["transactions"][transaction_id] = data
+
+        return transaction_id
+
+    def get_transaction_data(self, session_name):
+        session = self._session(session_name)
+        session["polls"] += 1
+        if session["polls"] <= self.ready_after:
+            return []
+
+        return list(session["transactions"])
+
+    def get_transaction_data_by_id(self, session_name, transaction_id):
+        return self._session(session_name)["transactions"][transaction_id]
+
+    def get_apigee_variable_from_trace(self, name, data):
+        return index_variables(data).get(name)
+
+    def delete_debugsession_by_name(self, session_name):
+        self._session(session_name)
+        del self.sessions[session_name]
+        self.deleted.append(session_name)
+
+        return {"name": session_name}
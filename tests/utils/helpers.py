@@ -1,7 +1,20 @@
+from tests.utils.trace import TraceCollector
+
+
 def get_variable_from_trace(debug, session_name, variable):
-    trace_ids = debug.get_transaction_data(session_name=session_name)
-    trace_data = debug.get_transaction_data_by_id(
-        session_name=session_name, transaction_id=trace_ids[0]
-    )
+    return TraceCollector(debug).collect(session_name).get(variable)
+
 
-    return debug.get_apigee_variable_from_trace(name=variable, data=trace_data)
+def authorization_key(authorization):
+    """Returns a hashable key for the identity an nhsd_apim_authorization marker logs in as"""
+    if not authorization:
+        return None
+
+    login_form = authorization.get("login_form") or {}
+
+    return (
+        authorization.get("access"),
+        authorization.get("level"),
+        tuple(sorted(login_form.items())),
+        authorization.get("authentication", "combined"),
+    )
@@ -0,0 +1,43 @@
+"""
+A pooled HTTP client shared by the tests.
+"""
+from http.cookiejar import DefaultCookiePolicy
+
+import requests
+
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class PooledSession(requests.Session):
+    """
+    A requests session with keep-alive connection pooling.
+
+    Requests without an explicit timeout get the default one. Failures to
+    connect are retried with backoff, but nothing is retried once a request
+    has been sent, so non-idempotent calls are never repeated. Cookies are
+    never stored, so one test's responses can't leak into the next.
+    """
+
+    def __init__(self, pool_size=10, timeout=60, connect_retries=3):
+        super().__init__()
+        self.timeout = timeout
+        self.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+
+        retry = Retry(
+            total=connect_retries,
+            connect=connect_retries,
+            read=0,
+            status=0,
+            other=0,
+            backoff_factor=0.5,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry
+        )
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return super().request(method, url, **kwargs)
@@ -0,0 +1,88 @@
+"""
+Drives an endpoint at a fixed request rate and summarises the latencies.
+"""
+import statistics
+import time
+
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from tests.utils.http import PooledSession
+
+
+class LoadReport:
+    """Latency percentiles, outcome mix and 429 onset for one load run"""
+
+    def __init__(self, samples, duration):
+        # (seconds into the run the request was due, latency in seconds, outcome)
+        self.samples = sorted(samples)
+        self.duration = duration
+
+    @property
+    def outcomes(self):
+        """Counts of each status code, or exception name for requests that got no response"""
+        return Counter(outcome for _, _, outcome in self.samples)
+
+    @property
+    def throttled_after(self):
+        """Seconds into the run of the first 429, or None if there wasn't one"""
+        return next(
+            (offset for offset, _, outcome in self.samples if outcome == 429), None
+        )
+
+    def percentiles(self, *points):
+        """Latency in milliseconds at each percentile, e.g. percentiles(50, 95, 99)"""
+        latencies = [latency * 1000 for _, latency, _ in self.samples]
+        if len(latencies) < 2:
+            return {point: (latencies or [None])[0] for point in points}
+
+        cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+        return {point: round(cuts[point - 1], 1) for point in points}
+
+    def summary(self):
+        p50, p95, p99 = self.percentiles(50, 95, 99).values()
+        return {
+            "requests": len(self.samples),
+            "achieved_rps": round(len(self.samples) / self.duration, 2),
+            "p50_ms": p50,
+            "p95_ms": p95,
+            "p99_ms": p99,
+            "outcomes": dict(self.outcomes),
+            "throttled_after_s": self.throttled_after,
+        }
+
+
+def run_load(url, headers=None, rps=5, duration=30, max_workers=None):
+    """
+    Sends GETs to url at a steady `rps` for `duration` seconds.
+
+    Requests are scheduled up front rather than waiting for earlier ones to
+    finish, and latency is measured from when a request was due, so a slow
+    proxy shows up as latency instead of quietly lowering the request rate.
+    Connection failures are not retried.
+    """
+    max_workers = max_workers or max(4, int(rps * 2))
+    interval = 1 / rps
+    total = int(rps * duration)
+
+    def send(due):
+        try:
+            outcome = session.get(url, headers=headers).status_code
+        except requests.RequestException as e:
+            outcome = type(e).__name__
+        return due - started, time.monotonic() - due, outcome
+
+    with PooledSession(pool_size=max_workers, connect_retries=0) as session:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            started = time.monotonic()
+            futures = []
+            for i in range(total):
+                due = started + i * interval
+                time.sleep(max(0, due - time.monotonic()))
+                futures.append(executor.submit(send, due))
+
+            samples = [future.result() for future in futures]
+
+    return LoadReport(samples, time.monotonic() - started)
@@ -0,0 +1,86 @@
+"""
+Waits for a deployment to be served by several endpoints at once.
+"""
+import asyncio
+import random
+import time
+
+import aiohttp
+
+
+class EndpointReadiness:
+    """The outcome of polling one endpoint for a deployed commit"""
+
+    def __init__(self, name, status_code, body, attempts, elapsed, error=None):
+        self.name = name
+        self.status_code = status_code
+        self.body = body
+        self.attempts = attempts
+        self.elapsed = elapsed
+        self.error = error
+
+    @property
+    def commit_id(self):
+        return (self.body or {}).get("commitId")
+
+    def __repr__(self):
+        return (
+            f"EndpointReadiness({self.name}, status_code={self.status_code}, "
+            f"commit_id={self.commit_id}, attempts={self.attempts}, elapsed={self.elapsed:.2f}s)"
+        )
+
+
+async def _poll(session, name, url, headers, commit_id, deadline, initial_delay, max_delay):
+    started = time.monotonic()
+    delay = initial_delay
+    attempts = 0
+
+    while True:
+        attempts += 1
+        # Cap each request at the time left, but give the last attempt a chance to answer
+        timeout = aiohttp.ClientTimeout(total=max(deadline - time.monotonic(), 1))
+        try:
+            async with session.get(url, headers=headers, timeout=timeout) as resp:
+                status_code = resp.status
+                body = await resp.json(content_type=None) if status_code == 200 else None
+            error = None
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            # The proxy may be mid-deployment, so keep trying until the deadline
+            status_code, body, error = None, None, e
+
+        # Anything but a 200 won't fix itself, so stop polling straight away
+        if error is None and (status_code != 200 or body.get("commitId") == commit_id):
+            break
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+
+        await asyncio.sleep(min(random.uniform(delay / 2, delay), remaining))
+        delay = min(delay * 2, max_delay)
+
+    return EndpointReadiness(name, status_code, body, attempts, time.monotonic() - started, error)
+
+
+async def wait_for_commit(endpoints, commit_id, timeout=60, initial_delay=0.25, max_delay=5):
+    """
+    Polls every endpoint concurrently until it reports commit_id.
+
+    `endpoints` maps a name to a (url, headers) pair. Each endpoint is polled
+    with exponential backoff and jitter until it serves the commit, returns
+    something other than a 200 or the shared deadline passes. Connection
+    errors and timeouts are retried, and the last one is kept in the
+    result's error if the deadline passes first. Returns a dict
+    of name to EndpointReadiness, whose elapsed is the time to ready.
+    """
+    deadline = time.monotonic() + timeout
+
+    async with aiohttp.ClientSession() as session:
+        results = await asyncio.gather(
+            *(
+                _poll(session, name, url, headers, commit_id, deadline, initial_delay, max_delay)
+                for name, (url, headers) in endpoints.items()
+            )
+        )
+
+    return {result.name: result for result in results}
@@ -0,0 +1,148 @@
+"""
+Checks for the payloads the LogToSplunk shared flow sends to Splunk.
+"""
+import json
+import os.path
+
+from functools import lru_cache
+
+from jsonschema.validators import validator_for
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), "splunk_logging_schema.json")
+
+# Headers that must never be logged
+DENIED_HEADERS = [
+    "accept-coding",
+    "accept-language",
+    "authorization",
+    "connection",
+    "cookie",
+    "strict-transport-security",
+]
+
+# Headers logged under their own key, so they shouldn't also appear in headers
+LOGGED_HEADERS = {
+    "request": {
+        "content-type": "content_type",
+        "content-encoding": "content_encoding",
+        "content-length": "content_length",
+        "x-request-id": "requestID",
+        "x-correlation-id": "correlationID",
+        "host": "host",
+        "x-forwarded-port": "port",
+    },
+    "response": {
+        "content-type": "content_type",
+        "content-encoding": "content_encoding",
+        "content-length": "content_length",
+    },
+}
+
+
+@lru_cache(maxsize=None)
+def get_schema_validator():
+    """Loads and checks the Splunk payload schema once, returning a reusable validator"""
+    with open(SCHEMA_PATH) as f:
+        schema = json.load(f)
+
+    validator_class = validator_for(schema)
+    validator_class.check_schema(schema)
+
+    return validator_class(schema)
+
+
+def schema_errors(payload):
+    """Returns every way the payload breaks the schema, as 'path: message' strings"""
+    return [
+        f"/{'/'.join(str(p) for p in error.absolute_path)}: {error.message}"
+        for error in get_schema_validator().iter_errors(payload)
+    ]
+
+
+def validate_payloads(payloads):
+    """Validates many payloads, returning a dict of index to errors for the invalid ones"""
+    results = {}
+    for index, payload in enumerate(payloads):
+        errors = schema_errors(payload)
+        if errors:
+            results[index] = errors
+
+    return results
+
+
+def _object(value):
+    return value if isinstance(value, dict) else {}
+
+
+def _headers(payload, message_type):
+    return _object(_object(_object(payload).get(message_type)).get("headers"))
+
+
+def denied_header_errors(payload):
+    """Returns a violation for each deny-listed header that was logged"""
+    return [
+        f"/{message_type}/headers: {header} is deny-listed"
+        for message_type in LOGGED_HEADERS
+        for header in _headers(payload, message_type)
+        if header.lower() in DENIED_HEADERS
+    ]
+
+
+def header_case_errors(payload):
+    """Returns a violation for each header name that wasn't logged in lower case"""
+    return [
+        f"/{message_type}/headers: {header} is not lower case"
+        for message_type in LOGGED_HEADERS
+        for header in _headers(payload, message_type)
+        if header != header.lower()
+    ]
+
+
+def duplicated_header_errors(payload):
+    """Returns a violation for each header logged both under its own key and in headers"""
+    errors = []
+    for message_type, logged_headers in LOGGED_HEADERS.items():
+        for header in _headers(payload, message_type):
+            splunk_key = logged_headers.get(header.lower())
+            if splunk_key:
+                errors.append(
+                    f"/{message_type}/headers: {header} is already logged as {splunk_key}"
+                )
+
+    return errors
+
+
+def client_sent_timestamp_errors(payload):
+    """Returns violations unless client sent_start and sent_end are positive and in order"""
+    client = _object(_object(payload).get("client"))
+    try:
+        sent_start = int(client.get("sent_start"))
+        sent_end = int(client.get("sent_end"))
+    except (TypeError, ValueError):
+        return ["/client: sent_start and sent_end must be integers"]
+
+    if sent_start <= 0 or sent_end <= 0:
+        return [f"/client: sent_start {sent_start} and sent_end {sent_end} must be positive"]
+    if sent_end < sent_start:
+        return [f"/client: sent_end {sent_end} is before sent_start {sent_start}"]
+
+    return []
+
+
+RULES = {
+    "schema": schema_errors,
+    "denied_headers": denied_header_errors,
+    "header_case": header_case_errors,
+    "duplicated_headers": duplicated_header_errors,
+    "client_sent_timestamps": client_sent_timestamp_errors,
+}
+
+
+def check_payload(payload):
+    """
+    Runs every rule against a payload, returning a dict of rule name to its violations.
+
+    A payload or section that isn't an object is reported by the schema
+    rule, and the other rules treat it as empty rather than failing.
+    """
+    return {name: rule(payload) for name, rule in RULES.items()}
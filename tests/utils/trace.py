@@ -0,0 +1,254 @@
+"""
+Helpers for reading Apigee debug session (trace) data.
+"""
+import random
+import time
+import warnings
+
+from concurrent.futures import ThreadPoolExecutor
+from uuid import uuid4
+
+
+def iter_variable_accesses(data):
+    """Yields (action, name, value) for every variable Get/Set in a transaction, in execution order"""
+    for point in data["point"]:
+        if point.get("id", "") != "Execution":
+            continue
+
+        for result in point.get("results") or []:
+            if result.get("ActionResult", "") != "VariableAccess":
+                continue
+
+            for item in result["accessList"]:
+                for action in ("Get", "Set"):
+                    if action in item:
+                        yield action, item[action].get("name", ""), item[action].get("value", "")
+
+
+def index_variables(data):
+    """
+    Maps every variable name in a transaction to its value.
+
+    The first access wins, matching get_apigee_variable_from_trace.
+    """
+    index = {}
+    for _, name, value in iter_variable_accesses(data):
+        index.setdefault(name, value)
+
+    return index
+
+
+class TraceIndex:
+    """
+    Every variable access in a transaction, indexed by name in one pass.
+
+    A variable's value is the last one Set, or the first one read if the
+    flow never sets it. The full list of accesses is kept for assertions
+    about how a value changed along the flow.
+    """
+
+    def __init__(self, data):
+        self.values = {}
+        self.history = {}
+
+        for action, name, value in iter_variable_accesses(data):
+            accesses = self.history.setdefault(name, [])
+            accesses.append((action, value))
+            if action == "Set" or len(accesses) == 1:
+                self.values[name] = value
+
+    def get(self, name):
+        """Returns the current value of a variable, or None if it was never accessed"""
+        return self.values.get(name)
+
+    def first(self, name):
+        """Returns the first value accessed, as get_apigee_variable_from_trace does"""
+        accesses = self.history.get(name)
+
+        return accesses[0][1] if accesses else None
+
+    def writes(self, name):
+        """Returns every value Set on a variable, in order"""
+        return [value for action, value in self.history.get(name, []) if action == "Set"]
+
+    def with_prefix(self, prefix):
+        """Returns a dict of name to value for every variable whose name starts with `prefix`"""
+        return {
+            name: value for name, value in self.values.items() if name.startswith(prefix)
+        }
+
+
+class TraceSnapshot:
+    """
+    The transactions recorded by a debug session, downloaded once.
+
+    Variable lookups are answered from an in-memory index, so checking
+    many flow variables costs a single set of calls to Apigee.
+    """
+
+    def __init__(self, transaction_ids, transactions):
+        self.transaction_ids = transaction_ids
+        self.transactions = transactions
+        self._indexes = {}
+
+    @classmethod
+    def fetch(cls, debug, session_name):
+        """Downloads every transaction recorded by the debug session"""
+        transaction_ids = debug.get_transaction_data(session_name=session_name)
+        transactions = [
+            debug.get_transaction_data_by_id(
+                session_name=session_name, transaction_id=transaction_id
+            )
+            for transaction_id in transaction_ids
+        ]
+
+        return cls(transaction_ids, transactions)
+
+    def index(self, transaction=0):
+        """Returns the TraceIndex for a transaction, building it on first use"""
+        if transaction not in self._indexes:
+            self._indexes[transaction] = TraceIndex(self.transactions[transaction])
+
+        return self._indexes[transaction]
+
+    def variables(self, transaction=0):
+        """Returns a dict of every variable's current value in a transaction"""
+        return self.index(transaction).values
+
+    def get(self, name, transaction=0):
+        """Returns the current value of a variable, or None if it was never accessed"""
+        return self.index(transaction).get(name)
+
+    def get_many(self, names, transaction=0):
+        """Returns a dict of name to value for every requested variable"""
+        variables = self.variables(transaction)
+
+        return {name: variables.get(name) for name in names}
+
+    def with_prefix(self, prefix, transaction=0):
+        """Returns a dict of name to value for every variable whose name starts with `prefix`"""
+        return self.index(transaction).with_prefix(prefix)
+
+
+class TraceCollector:
+    """
+    Waits for a debug session to record transactions.
+
+    Apigee makes transactions available some time after the proxy has
+    responded, so the transaction list is polled with exponential backoff
+    and jitter until enough have arrived or the deadline passes. Bodies are
+    downloaded in the background as soon as their ids appear, while polling
+    for the rest carries on.
+    """
+
+    def __init__(self, debug, timeout=60, initial_delay=0.1, max_delay=5, max_workers=4):
+        self.debug = debug
+        self.timeout = timeout
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.max_workers = max_workers
+
+    def collect(self, session_name, expected=1):
+        """Returns a TraceSnapshot once the session holds at least `expected` transactions"""
+        deadline = time.monotonic() + self.timeout
+        delay = self.initial_delay
+        bodies = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while True:
+                transaction_ids = self.debug.get_transaction_data(
+                    session_name=session_name
+                )
+                for transaction_id in transaction_ids:
+                    if transaction_id not in bodies:
+                        bodies[transaction_id] = executor.submit(
+                            self.debug.get_transaction_data_by_id,
+                            session_name=session_name,
+                            transaction_id=transaction_id,
+                        )
+
+                if len(transaction_ids) >= expected:
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(
+                        f"Debug session {session_name} recorded {len(transaction_ids)} of "
+                        f"{expected} transactions within {self.timeout}s"
+                    )
+
+                time.sleep(min(random.uniform(delay / 2, delay), remaining))
+                delay = min(delay * 2, self.max_delay)
+
+            transactions = [bodies[t].result() for t in transaction_ids]
+
+        return TraceSnapshot(transaction_ids, transactions)
+
+
+class DebugSession:
+    """A debug session that records requests carrying its trace_id header"""
+
+    def __init__(self, debug, name):
+        self.debug = debug
+        self.name = name
+        self.header_filters = {"trace_id": name}
+
+    def collect(self, expected=1):
+        """Waits for the session to record `expected` transactions and returns a TraceSnapshot"""
+        return TraceCollector(self.debug).collect(self.name, expected=expected)
+
+
+class DebugSessions:
+    """
+    Opens debug sessions and deletes them in batches.
+
+    Sessions are deleted together when the context exits, or earlier once
+    `max_open` are outstanding so we stay well under the org's debug
+    session limit. Deletes run concurrently and a failed delete is reported
+    as a warning rather than failing the test that opened the session.
+    """
+
+    def __init__(self, name_prefix="", max_open=10, max_workers=4):
+        self.name_prefix = name_prefix
+        self.max_open = max_open
+        self.max_workers = max_workers
+        self._open = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close_all()
+
+    def open(self, debug):
+        """Starts a new debug session filtered on a unique trace_id header"""
+        if len(self._open) >= self.max_open:
+            self.close_all()
+
+        session = DebugSession(debug, f"{self.name_prefix}{uuid4()}")
+        debug.post_debugsession(
+            session=session.name, header_filters=session.header_filters
+        )
+        self._open.append(session)
+
+        return session
+
+    def close_all(self):
+        """Deletes every session opened so far"""
+        sessions, self._open = self._open, []
+        if not sessions:
+            return
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                session.name: executor.submit(
+                    session.debug.delete_debugsession_by_name, session.name
+                )
+                for session in sessions
+            }
+
+        for session_name, future in futures.items():
+            if future.exception() is not None:
+                warnings.warn(
+                    f"Could not delete debug session {session_name}: {future.exception()}"
+                )